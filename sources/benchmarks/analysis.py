@@ -2,6 +2,7 @@ import argparse
 
 import matplotlib.pyplot as plt
 import pandas as pd
+from common import LEGACY_COLUMNS
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
@@ -26,7 +27,8 @@ if __name__ == "__main__":
 
     args = parser.parse_args()
 
-    df = pd.read_csv(args.filepath)
+    df = pd.read_csv(args.filepath).rename(columns=LEGACY_COLUMNS)
+    time = "wall_time" if "wall_time" in df else "legacy_time"
 
     df1 = df[
         (df["population_size"] == args.population_size)
@@ -36,23 +38,22 @@ if __name__ == "__main__":
     diff_df = df1[df1["class"] != df1["target"]]
 
     plt.figure(figsize=(16, 9), dpi=150)
-    plt.title(
-        f"""Time comparison
-        Population size: {args.population_size} - Workers: {args.workers}"""
-    )
+    plt.title(f"""Time comparison
+        Population size: {args.population_size} - Workers: {args.workers}""")
     plt.bar(
         same_df["point"].values - 0.06,
-        same_df["time"],
+        same_df[time],
         width=0.1,
         label="same class",
     )
     plt.bar(
         diff_df["point"].values + 0.06,
-        diff_df["time"],
+        diff_df[time],
         width=0.1,
         label="different class",
     )
 
+    plt.ylabel(time.replace("_", " "))
     plt.legend()
     plt.grid()
     plt.show()
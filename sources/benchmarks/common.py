@@ -1,17 +1,61 @@
 import argparse
+import datetime
+import glob
+import importlib.metadata
+import json
+import os
+import platform
 
 import numpy as np
 import pandas as pd
 from sklearn.model_selection import train_test_split
 
+# ppga, the in-tree engine built on its toolbox and DEAP
+LIBRARIES = ["ppga", "engine", "deap"]
+MODELS = ["RandomForestClassifier", "SVC", "MLPClassifier"]
+
+# columns of the results written before the config-driven runner, whose
+# time added the process time of the parent to the evaluation times, so it
+# is not comparable with the wall time
+LEGACY_COLUMNS = {"classifier": "model", "time": "legacy_time"}
+
+# default values of the optional keys of a config file
+DEFAULTS = {
+    "libraries": LIBRARIES,
+    "models": MODELS,
+    "population_sizes": [1000],
+    "workers": [1],
+    "datasets": ["classification_10010_16_2_1_0.csv"],
+    "test_size": 2,
+    "generations": 10,
+    "cxpb": 0.7,
+    "mutpb": 0.3,
+    "repeats": 1,
+    "warmups": 1,
+}
+
 
 def parse_args():
     parser = argparse.ArgumentParser()
 
     parser.add_argument(
-        "model",
+        "config",
         type=str,
-        help="specify the model to benchmark",
+        help="specify the JSON config file of the benchmark",
+    )
+
+    parser.add_argument(
+        "--library",
+        choices=LIBRARIES,
+        action="append",
+        help="run only the given library, can be repeated",
+    )
+
+    parser.add_argument(
+        "--model",
+        choices=MODELS,
+        action="append",
+        help="run only the given model, can be repeated",
     )
 
     parser.add_argument(
@@ -31,6 +75,51 @@ def parse_args():
     return parser.parse_args()
 
 
+def load_config(path: str) -> dict:
+    """
+    Reads a benchmark config, fills the missing keys with the defaults and
+    expands the glob patterns of the datasets, every one of which must
+    match at least a file
+    """
+    with open(path) as f:
+        config = {**DEFAULTS, **json.load(f)}
+
+    config.setdefault("name", os.path.basename(path).removesuffix(".json"))
+    datasets = []
+    for pattern in config["datasets"]:
+        matches = sorted(glob.glob(os.path.join("datasets", pattern)))
+        if len(matches) == 0:
+            raise FileNotFoundError(f"no dataset matches {pattern}")
+        datasets.extend(matches)
+    config["datasets"] = [os.path.basename(fp) for fp in datasets]
+
+    return config
+
+
+def version(package: str) -> str | None:
+    try:
+        return importlib.metadata.version(package)
+    except importlib.metadata.PackageNotFoundError:
+        return None
+
+
+def environment() -> dict:
+    """
+    Describes the machine and the libraries a benchmark runs on
+    """
+    return {
+        "date": datetime.datetime.now().isoformat(timespec="seconds"),
+        "host": platform.node(),
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "cores": os.cpu_count(),
+        "python": platform.python_version(),
+        "packages": {
+            p: version(p) for p in ["numpy", "scikit-learn", "pandas", "deap", "ppga"]
+        },
+    }
+
+
 def make_predictions(model, data: pd.DataFrame, test_size):
     features_index = [col for col in data.columns if col.startswith("feature_")]
     X = data[features_index].to_numpy()
@@ -2,11 +2,7 @@
 
 
 # population
-python benchmarks/deap_pop.py MLPClassifier --suffix=final5 --log=info
-python benchmarks/ppga_pop.py MLPClassifier --suffix=final5 --log=info
+python benchmarks/runner.py benchmarks/configs/population.json --suffix=final5 --log=info
 
-python benchmarks/deap_pop.py SVC --suffix=final5 --log=info
-python benchmarks/ppga_pop.py SVC --suffix=final5 --log=info
-
-python benchmarks/deap_pop.py RandomForestClassifier --suffix=final5 --log=info
-python benchmarks/ppga_pop.py RandomForestClassifier --suffix=final5 --log=info
+# features
+python benchmarks/runner.py benchmarks/configs/features.json --suffix=final5 --log=info
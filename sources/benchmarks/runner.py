@@ -0,0 +1,246 @@
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+from common import environment, load_config, make_predictions, parse_args
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.neural_network import MLPClassifier
+from sklearn.svm import SVC
+
+from neighborhood_generator import engine, genetic, genetic_deap, halloffame, writer
+from ppga import algorithms, base, log
+
+logger = log.getUserLogger()
+
+COLUMNS = [
+    "library",
+    "model",
+    "dataset",
+    "features",
+    "population_size",
+    "workers",
+    "point",
+    "class",
+    "target",
+    "repeat",
+    "wall_time",
+    "cpu_time",
+    "children_cpu_time",
+    "eval_time",
+    "evals",
+    "generations",
+    "session",
+]
+
+
+def make_model(name: str):
+    return {
+        "RandomForestClassifier": RandomForestClassifier,
+        "SVC": SVC,
+        "MLPClassifier": MLPClassifier,
+    }[name]()
+
+
+def make_toolbox(library: str, X: np.ndarray):
+    if library in ("ppga", "engine"):
+        return genetic.create_toolbox(X)
+
+    return genetic_deap.create_toolbox_deap(X)
+
+
+def update_toolbox(library: str, toolbox, point: np.ndarray, target: int, model):
+    if library in ("ppga", "engine"):
+        return genetic.update_toolbox(toolbox, point, target, model)
+
+    return genetic_deap.update_toolbox_deap(toolbox, point, target, model)
+
+
+def run(library: str, toolbox, population_size: int, workers: int, config: dict):
+    # same genetic parameters for all the libraries
+    if library == "ppga":
+        _, stats = algorithms.simple(
+            toolbox,
+            population_size,
+            0.1,
+            config["cxpb"],
+            config["mutpb"],
+            config["generations"],
+            base.HallOfFame(population_size),
+            workers,
+        )
+        return stats
+
+    if library == "engine":
+        _, stats = engine.simple(
+            toolbox,
+            population_size,
+            keep=0.1,
+            cxpb=config["cxpb"],
+            mutpb=config["mutpb"],
+            max_generations=config["generations"],
+            hall_of_fame=halloffame.HallOfFame(population_size),
+            workers_num=workers,
+        )
+        return stats
+
+    _, stats = genetic_deap.run_deap(
+        toolbox,
+        population_size,
+        workers,
+        max_generations=config["generations"],
+        cxpb=config["cxpb"],
+        mutpb=config["mutpb"],
+    )
+
+    return stats
+
+
+def measure(func) -> tuple[object, dict[str, float]]:
+    """
+    Calls `func` and returns its result with the wall clock time, the CPU
+    time of this process and the one of the worker processes it joined
+    """
+    before = os.times()
+    start = time.perf_counter()
+    result = func()
+    wall_time = time.perf_counter() - start
+    after = os.times()
+
+    return result, {
+        "wall_time": wall_time,
+        "cpu_time": after.user - before.user + after.system - before.system,
+        "children_cpu_time": after.children_user
+        - before.children_user
+        + after.children_system
+        - before.children_system,
+    }
+
+
+def benchmark(
+    library: str,
+    model_name: str,
+    dataset: str,
+    X: np.ndarray,
+    y: np.ndarray,
+    model,
+    population_size: int,
+    workers: int,
+    config: dict,
+    store: writer.ResultStore,
+    session: str,
+) -> None:
+    """
+    Runs a cell of the grid, every point and target of the dataset, and
+    appends to the store the repeats of every (point, target) not already
+    in it
+    """
+    outcomes = np.unique(y)
+    params = {k: config[k] for k in ["test_size", "generations", "cxpb", "mutpb"]}
+    cell = {
+        "library": library,
+        "model": model_name,
+        "dataset": dataset,
+        "population_size": population_size,
+        "workers": workers,
+        "repeats": config["repeats"],
+        **params,
+    }
+    pending = []
+    for i in range(len(X)):
+        for target in outcomes:
+            key = writer.config_key({**cell, "point": i, "target": int(target)})
+            if key not in store:
+                pending.append((i, target, key))
+    if len(pending) == 0:
+        return
+
+    # warm-up runs of the cell, not recorded
+    toolbox = make_toolbox(library, X)
+    toolbox = update_toolbox(library, toolbox, X[0], int(outcomes[0]), model)
+    for _ in range(config["warmups"]):
+        run(library, toolbox, population_size, workers, config)
+
+    for i, target, key in pending:
+        logger.info(f"point {i + 1}/{len(y)}, target {target}")
+        toolbox = update_toolbox(library, toolbox, X[i], int(target), model)
+
+        rows = []
+        for r in range(config["repeats"]):
+            stats, times = measure(
+                lambda: run(library, toolbox, population_size, workers, config)
+            )
+            rows.append(
+                {
+                    "library": library,
+                    "model": model_name,
+                    "dataset": dataset,
+                    "features": X.shape[1],
+                    "population_size": population_size,
+                    "workers": workers,
+                    "point": i,
+                    "class": y[i],
+                    "target": target,
+                    "repeat": r,
+                    **times,
+                    "eval_time": float(np.sum(stats.times)),
+                    "evals": int(np.sum(stats.evals)),
+                    "generations": len(stats.times),
+                    "session": session,
+                }
+            )
+        store.append(key, pd.DataFrame(rows, columns=COLUMNS))
+
+
+if __name__ == "__main__":
+    # get CLI args
+    args = parse_args()
+    config = load_config(args.config)
+    libraries = args.library or config["libraries"]
+    models = args.model or config["models"]
+
+    # set the logger
+    logger.setLevel(args.log.upper())
+
+    # finished configurations are skipped, a run resumes the previous ones
+    name = f"{config['name']}_{args.suffix}" if args.suffix else config["name"]
+    store = writer.ResultStore(f"results/performance/{name}.csv")
+    logger.info(f"{len(store)} configurations already done")
+
+    # the environment of every run goes next to the results
+    env = environment()
+    session = writer.config_key(env)
+    with open(f"results/performance/{name}.jsonl", "a") as f:
+        record = {"session": session, "environment": env, "config": config}
+        f.write(json.dumps(record) + "\n")
+
+    for model_name in models:
+        for dataset in config["datasets"]:
+            model = make_model(model_name)
+            X, y = make_predictions(
+                model, pd.read_csv(f"datasets/{dataset}"), config["test_size"]
+            )
+
+            for library in libraries:
+                for w in config["workers"]:
+                    for ps in config["population_sizes"]:
+                        logger.info(f"library: {library}")
+                        logger.info(f"model: {model_name}")
+                        logger.info(f"dataset: {dataset}")
+                        logger.info(f"population_size: {ps}")
+                        logger.info(f"workers: {w}")
+
+                        benchmark(
+                            library,
+                            model_name,
+                            dataset,
+                            X,
+                            y,
+                            model,
+                            ps,
+                            w,
+                            config,
+                            store,
+                            session,
+                        )
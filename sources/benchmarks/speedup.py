@@ -0,0 +1,267 @@
+import argparse
+import glob
+import os
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+from common import LEGACY_COLUMNS, LIBRARIES, MODELS
+
+# a configuration of the grid, whose runs differ only by the workers
+KEYS = ["experiment", "library", "model", "population_size", "features"]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument(
+        "paths",
+        type=str,
+        nargs="*",
+        default=["results/performance"],
+        help="specify the results files or directories to analyze",
+    )
+
+    parser.add_argument(
+        "--output",
+        type=str,
+        default="results/speedup",
+        help="specify the directory of the tables and plots",
+    )
+
+    parser.add_argument(
+        "--format",
+        choices=["csv", "parquet"],
+        default="csv",
+        help="specify the format of the tables",
+    )
+
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.5,
+        help="specify the efficiency below which a configuration stops scaling",
+    )
+
+    parser.add_argument(
+        "--no-plots",
+        action="store_true",
+        help="export only the tables",
+    )
+
+    return parser.parse_args()
+
+
+def find_results(paths: list[str]) -> list[str]:
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(glob.glob(os.path.join(path, "*.csv"))))
+            files.extend(sorted(glob.glob(os.path.join(path, "*.parquet"))))
+        else:
+            files.append(path)
+
+    return files
+
+
+def read_results(path: str) -> pd.DataFrame | None:
+    """
+    Reads a results file of the runner: the library comes from the file
+    name and the features are 0 when not recorded. The experiment is the
+    file name without library and model, so that the same grid run with
+    all the libraries is compared. Returns None for files that are not
+    results of the runner, also the legacy ones, whose time is not a wall
+    time.
+    """
+    if path.endswith(".parquet"):
+        df = pd.read_parquet(path)
+    else:
+        df = pd.read_csv(path)
+    df = df.rename(columns=LEGACY_COLUMNS)
+
+    name = os.path.splitext(os.path.basename(path))[0]
+    prefix = next((lib for lib in LIBRARIES if name.startswith(lib)), "")
+    if "library" not in df and prefix:
+        df["library"] = prefix
+    if "features" not in df:
+        df["features"] = 0
+
+    columns = ["library", "model", "population_size", "features", "workers"]
+    if not set(columns + ["wall_time"]).issubset(df.columns):
+        return None
+
+    tokens = name.removeprefix(prefix).split("_")
+    df["experiment"] = "_".join(t for t in tokens if t and t not in MODELS)
+
+    return df[KEYS + ["workers", "wall_time"]]
+
+
+def speedup(runs: pd.DataFrame) -> pd.DataFrame:
+    """
+    Returns the mean wall time of every configuration and number of
+    workers, with speedup and efficiency over the single worker runs of
+    the configuration and the Karp-Flatt serial fraction
+    """
+    table = runs.groupby(KEYS + ["workers"], as_index=False).agg(
+        wall_time=("wall_time", "mean"), runs=("wall_time", "size")
+    )
+    baseline = table[table["workers"] == 1].set_index(KEYS)["wall_time"]
+    table = table.join(baseline.rename("baseline"), on=KEYS)
+
+    workers = table["workers"]
+    table["speedup"] = table["baseline"] / table["wall_time"]
+    table["efficiency"] = table["speedup"] / workers
+    table["karp_flatt"] = np.where(
+        workers > 1, (1 / table["speedup"] - 1 / workers) / (1 - 1 / workers), np.nan
+    )
+
+    return table
+
+
+def summarize(table: pd.DataFrame, threshold: float = 0.5) -> pd.DataFrame:
+    """
+    Returns a row per configuration with its best number of workers, the
+    largest one that keeps the efficiency above `threshold` and the
+    Amdahl serial fraction fitted on all its speedups.
+
+    Amdahl's law `1/S(p) = f + (1 - f)/p` is linear in `1 - 1/p`, so the
+    serial fraction `f` is the least squares slope through the origin of
+    the Karp-Flatt points. A positive `overhead` is the growth of the
+    Karp-Flatt fraction per worker, the share of the lost speedup due to
+    the parallel overhead rather than to the serial part.
+    """
+    rows = []
+    for key, group in table.dropna(subset=["speedup"]).groupby(KEYS):
+        parallel = group[group["workers"] > 1]
+        if len(parallel) == 0:
+            continue
+
+        workers = parallel["workers"].to_numpy(dtype=float)
+        x = 1 - 1 / workers
+        y = 1 / parallel["speedup"].to_numpy() - 1 / workers
+        serial = float(np.clip((x * y).sum() / (x * x).sum(), 0.0, 1.0))
+        overhead = np.nan
+        if len(parallel) > 1:
+            overhead = float(np.polyfit(workers, parallel["karp_flatt"], 1)[0])
+
+        best = group.loc[group["wall_time"].idxmin()]
+        scaling = group.loc[group["efficiency"] >= threshold, "workers"]
+        rows.append(
+            {
+                **dict(zip(KEYS, key)),
+                "baseline": best["baseline"],
+                "best_workers": int(best["workers"]),
+                "max_speedup": best["speedup"],
+                "best_efficiency": best["efficiency"],
+                "scaling_limit": int(scaling.max()) if len(scaling) > 0 else 1,
+                "serial_fraction": serial,
+                "amdahl_limit": 1 / serial if serial > 0 else np.inf,
+                "overhead": overhead,
+            }
+        )
+
+    return pd.DataFrame(rows)
+
+
+def label(library: str, population_size: int, features: int) -> str:
+    if features > 0:
+        return f"{library} - population {population_size} - {features} features"
+
+    return f"{library} - population {population_size}"
+
+
+def plot_scaling(table: pd.DataFrame, output: str) -> None:
+    """
+    Plots speedup and efficiency by workers of every experiment and model
+    """
+    table = table.dropna(subset=["speedup"])
+    for (experiment, model), group in table.groupby(["experiment", "model"]):
+        fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(16, 9), dpi=150)
+        fig.suptitle(f"{model} - {experiment}")
+        for (library, ps, features), line in group.groupby(
+            ["library", "population_size", "features"]
+        ):
+            line = line.sort_values("workers")
+            name = label(library, ps, features)
+            ax1.plot(line["workers"], line["speedup"], marker="o", label=name)
+            ax2.plot(line["workers"], line["efficiency"], marker="o", label=name)
+
+        workers = np.sort(group["workers"].unique())
+        ax1.plot(workers, workers, "k--", label="ideal")
+        ax2.axhline(1.0, color="k", linestyle="--")
+        for ax, title in [(ax1, "Speedup"), (ax2, "Efficiency")]:
+            ax.set_title(title)
+            ax.set_xscale("log", base=2)
+            ax.set_xlabel("workers")
+            ax.grid()
+        ax1.legend(fontsize="small")
+
+        fig.savefig(os.path.join(output, f"{experiment}_{model}.png"))
+        plt.close(fig)
+
+
+def plot_serial_fraction(summary: pd.DataFrame, output: str) -> None:
+    """
+    Plots the serial fraction of every experiment by population size, or
+    by features if the experiment varies them
+    """
+    for experiment, group in summary.groupby("experiment"):
+        x = "features" if group["features"].nunique() > 1 else "population_size"
+        other = "population_size" if x == "features" else "features"
+
+        fig, ax = plt.subplots(figsize=(16, 9), dpi=150)
+        ax.set_title(f"Serial fraction - {experiment}")
+        for (library, model, value), line in group.groupby(["library", "model", other]):
+            line = line.sort_values(x)
+            name = f"{library} - {model}"
+            if value > 0:
+                name += f" - {other.replace('_', ' ')} {value}"
+            ax.plot(line[x], line["serial_fraction"], marker="o", label=name)
+
+        ax.set_xscale("log", base=2)
+        ax.set_xlabel(x.replace("_", " "))
+        ax.set_ylabel("serial fraction")
+        ax.legend(fontsize="small")
+        ax.grid()
+
+        fig.savefig(os.path.join(output, f"{experiment}_serial_fraction.png"))
+        plt.close(fig)
+
+
+def export(df: pd.DataFrame, path: str, fmt: str) -> None:
+    if fmt == "parquet":
+        df.to_parquet(f"{path}.parquet", index=False)
+    else:
+        df.to_csv(f"{path}.csv", index=False)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    frames = []
+    for path in find_results(args.paths):
+        df = read_results(path)
+        if df is None:
+            print(f"skipping {path}: no wall times of the runner")
+            continue
+        frames.append(df)
+    assert len(frames) > 0, "no performance results found"
+
+    table = speedup(pd.concat(frames, ignore_index=True))
+    summary = summarize(table, args.threshold)
+
+    os.makedirs(args.output, exist_ok=True)
+    export(table, os.path.join(args.output, "speedup"), args.format)
+    export(summary, os.path.join(args.output, "summary"), args.format)
+
+    with pd.option_context("display.width", 200, "display.max_rows", None):
+        print(
+            summary[
+                KEYS
+                + ["best_workers", "max_speedup", "scaling_limit", "serial_fraction"]
+            ].to_string(index=False, float_format="{:.3f}".format)
+        )
+
+    if not args.no_plots:
+        plot_scaling(table, args.output)
+        plot_serial_fraction(summary, args.output)
@@ -1,16 +1,60 @@
-from . import genetic
-from .genetic import create_toolbox, run, update_toolbox
+from . import (
+    adapters,
+    cache,
+    engine,
+    genetic,
+    halloffame,
+    islands,
+    operators,
+    parallel,
+    population,
+    profiling,
+    registry,
+    scheduling,
+    surrogate,
+    termination,
+    warmstart,
+    writer,
+)
+from .genetic import (
+    create_toolbox,
+    run,
+    run_islands,
+    run_multi,
+    run_steady,
+    update_toolbox,
+    update_toolbox_multi,
+)
 from .genetic_deap import create_toolbox_deap, run_deap, update_toolbox_deap
 from .neighborhood import generate, single_point
 from .neighborhood_deap import generate_deap, single_point_deap
 
 __all__ = [
+    "adapters",
+    "cache",
+    "engine",
     "genetic",
+    "halloffame",
+    "islands",
+    "operators",
+    "parallel",
+    "population",
+    "profiling",
+    "registry",
+    "scheduling",
+    "surrogate",
+    "termination",
+    "warmstart",
+    "writer",
     "generate",
     "single_point",
     "create_toolbox",
     "update_toolbox",
     "run",
+    "run_multi",
+    "run_islands",
+    "run_steady",
+    "update_toolbox_multi",
     "generate_deap",
     "single_point_deap",
     "create_toolbox_deap",
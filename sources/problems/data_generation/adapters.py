@@ -0,0 +1,228 @@
+import weakref
+
+import numpy as np
+from scipy.special import expit
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.neural_network import MLPClassifier
+from sklearn.svm import SVC
+
+# adapters already compiled by this process with the fitted state they were
+# compiled from, by model, dropped with it; None if the model has no adapter
+_compiled: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+_enabled = True
+_verify = False
+
+
+class Adapter:
+    """
+    Lean batched predictor compiled from a fitted sklearn classifier: it
+    keeps only the arrays the prediction needs and skips the input
+    validation of `predict`. With `verify` every prediction is checked
+    against the one of the original model.
+    """
+
+    def __init__(self, model, verify: bool = False) -> None:
+        # a weak reference, so that the cache does not keep the model alive
+        self.model = weakref.ref(model)
+        self.classes_ = np.asarray(model.classes_)
+        self.verify = verify
+
+    def _predict(self, X: np.ndarray) -> np.ndarray:
+        raise NotImplementedError
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        X = np.asarray(X, dtype=np.float64).reshape(len(X), -1)
+        labels = self._predict(X)
+        if self.verify:
+            expected = self.model().predict(X)
+            mismatches = np.count_nonzero(labels != expected)
+            assert mismatches == 0, f"{mismatches} predictions differ from the model"
+
+        return labels
+
+
+class MLPAdapter(Adapter):
+    """
+    Forward pass of an `MLPClassifier` from its `coefs_` and `intercepts_`
+    """
+
+    activations = {
+        "identity": lambda z: z,
+        "logistic": expit,
+        "tanh": np.tanh,
+        "relu": lambda z: np.maximum(z, 0.0),
+    }
+
+    def __init__(self, model: MLPClassifier, verify: bool = False) -> None:
+        super().__init__(model, verify)
+        self.coefs = [np.asarray(c, dtype=np.float64) for c in model.coefs_]
+        self.intercepts = [np.asarray(b, dtype=np.float64) for b in model.intercepts_]
+        self.activation = self.activations[model.activation]
+        self.binary = model.out_activation_ == "logistic"
+
+    def _predict(self, X: np.ndarray) -> np.ndarray:
+        z = X
+        for coef, intercept in zip(self.coefs[:-1], self.intercepts[:-1]):
+            z = self.activation(z @ coef + intercept)
+        z = z @ self.coefs[-1] + self.intercepts[-1]
+
+        if self.binary:
+            return self.classes_[(expit(z[:, 0]) > 0.5).astype(int)]
+
+        return self.classes_[np.argmax(z, axis=1)]
+
+
+class SVCAdapter(Adapter):
+    """
+    Decision function of an `SVC` from its support vectors, with the one
+    vs one vote of the multiclass case
+    """
+
+    def __init__(self, model: SVC, verify: bool = False) -> None:
+        super().__init__(model, verify)
+        self.kernel = model.kernel
+        self.gamma = float(model._gamma)
+        self.coef0 = float(model.coef0)
+        self.degree = int(model.degree)
+        self.support_vectors = np.asarray(model.support_vectors_, dtype=np.float64)
+        self.squared_norms = (self.support_vectors**2).sum(axis=1)
+        self.dual_coef = np.asarray(model.dual_coef_, dtype=np.float64)
+        self.intercept = np.asarray(model.intercept_, dtype=np.float64)
+        self.starts = np.concatenate([[0], np.cumsum(model.n_support_)])
+
+    def _kernel(self, X: np.ndarray) -> np.ndarray:
+        dot = X @ self.support_vectors.T
+        if self.kernel == "linear":
+            return dot
+        if self.kernel == "poly":
+            base = self.gamma * dot + self.coef0
+            power = np.ones_like(base)
+            for _ in range(self.degree):
+                power *= base
+            return power
+        if self.kernel == "sigmoid":
+            return np.tanh(self.gamma * dot + self.coef0)
+
+        distances = (X**2).sum(axis=1)[:, None] + self.squared_norms[None, :]
+        distances = np.maximum(distances - 2.0 * dot, 0.0)
+
+        return np.exp(-self.gamma * distances)
+
+    def _predict(self, X: np.ndarray) -> np.ndarray:
+        K = self._kernel(X)
+        if len(self.classes_) == 2:
+            decision = K @ self.dual_coef[0] + self.intercept[0]
+            return self.classes_[(decision > 0).astype(int)]
+
+        # one vs one, in the order of the libsvm pairs
+        votes = np.zeros((len(X), len(self.classes_)), dtype=int)
+        pair = 0
+        for i in range(len(self.classes_)):
+            si = slice(self.starts[i], self.starts[i + 1])
+            for j in range(i + 1, len(self.classes_)):
+                sj = slice(self.starts[j], self.starts[j + 1])
+                decision = (
+                    K[:, si] @ self.dual_coef[j - 1, si]
+                    + K[:, sj] @ self.dual_coef[i, sj]
+                    + self.intercept[pair]
+                )
+                votes[:, i] += decision > 0
+                votes[:, j] += decision <= 0
+                pair += 1
+
+        return self.classes_[np.argmax(votes, axis=1)]
+
+
+class ForestAdapter(Adapter):
+    """
+    Prediction of a `RandomForestClassifier` from the leaves its trees
+    reach, looked up in the class probabilities of all the trees
+    flattened in a single array
+    """
+
+    def __init__(self, model: RandomForestClassifier, verify: bool = False) -> None:
+        super().__init__(model, verify)
+        self.trees = [estimator.tree_ for estimator in model.estimators_]
+        counts = [t.node_count for t in self.trees]
+        self.offsets = np.concatenate([[0], np.cumsum(counts)])[:-1]
+
+        values = np.concatenate([t.value[:, 0, :] for t in self.trees])
+        totals = values.sum(axis=1, keepdims=True)
+        self.proba = np.divide(values, totals, where=totals > 0, out=values.copy())
+
+    def _predict(self, X: np.ndarray) -> np.ndarray:
+        # trees compare single precision features
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        proba = np.zeros((len(X), len(self.classes_)))
+        for tree, offset in zip(self.trees, self.offsets):
+            proba += self.proba[tree.apply(X) + offset]
+
+        return self.classes_[np.argmax(proba, axis=1)]
+
+
+def fitted_state(model) -> tuple:
+    """
+    Returns the fitted attributes of a sklearn model, the ones ending with
+    an underscore. A refit, also a partial one, replaces some of them, and
+    the cache keeps the old ones alive so that their ids are not reused.
+    """
+    return tuple(
+        value
+        for name, value in vars(model).items()
+        if name.endswith("_") and not name.startswith("_")
+    )
+
+
+def same_state(a: tuple, b: tuple) -> bool:
+    return len(a) == len(b) and all(x is y for x, y in zip(a, b))
+
+
+def compile_model(model, verify: bool = False):
+    """
+    Returns the adapter of a fitted model, or the model itself when it is
+    not one of the supported classifiers
+    """
+    if type(model) is MLPClassifier and model.activation in MLPAdapter.activations:
+        return MLPAdapter(model, verify)
+    if type(model) is SVC and model.kernel in ("linear", "poly", "rbf", "sigmoid"):
+        if not model.break_ties:
+            return SVCAdapter(model, verify)
+    if type(model) is RandomForestClassifier and model.n_outputs_ == 1:
+        return ForestAdapter(model, verify)
+
+    return model
+
+
+def configure(enabled: bool = True, verify: bool = False) -> None:
+    """
+    Turns the adapters used by the evaluation on or off and sets their
+    verification mode. Workers forked afterwards inherit the setting.
+    """
+    global _enabled, _verify
+    _enabled = enabled
+    _verify = verify
+    _compiled.clear()
+
+
+def adapt(model):
+    """
+    Returns the adapter of the model, compiled the first time this process
+    asks for it, or the model itself if adapters are disabled
+    """
+    if not _enabled or isinstance(model, Adapter):
+        return model
+
+    try:
+        state = fitted_state(model)
+        entry = _compiled.get(model)
+    except TypeError:
+        # neither a sklearn model nor hashable, nothing to compile
+        return model
+
+    # a model fitted again after its adapter was compiled needs a new one
+    if entry is None or not same_state(entry[0], state):
+        adapter = compile_model(model, _verify)
+        entry = (state, None if adapter is model else adapter)
+        _compiled[model] = entry
+
+    return model if entry[1] is None else entry[1]
@@ -0,0 +1,225 @@
+import multiprocessing as mp
+from collections import OrderedDict
+from multiprocessing import context, shared_memory
+
+import numpy as np
+
+# shared caches attached to the current process, by segment name
+_attached: dict[str, "SharedPredictionCache"] = {}
+
+
+def digest(chromosomes: np.ndarray) -> np.ndarray:
+    """
+    Computes a 64 bit hash of the bytes of every chromosome in the matrix.
+    Zero is never returned since it marks the empty slots of the shared
+    table.
+    """
+    rows = np.ascontiguousarray(chromosomes).reshape(len(chromosomes), -1)
+    data = rows.view(np.uint8).reshape(len(rows), -1)
+
+    # pad every row to a whole number of 64 bit words
+    padding = -data.shape[1] % 8
+    if padding > 0:
+        data = np.pad(data, ((0, 0), (0, padding)))
+    words = np.ascontiguousarray(data).view(np.uint64)
+
+    # FNV-1a over the words followed by the murmur3 finalizer
+    h = np.full(len(words), 0xCBF29CE484222325, dtype=np.uint64)
+    with np.errstate(over="ignore"):
+        for column in words.T:
+            h ^= column
+            h *= np.uint64(0x100000001B3)
+        h ^= h >> np.uint64(33)
+        h *= np.uint64(0xFF51AFD7ED558CCD)
+        h ^= h >> np.uint64(33)
+
+    h[h == 0] = 1
+
+    return h
+
+
+class PredictionCache:
+    """
+    Process local LRU cache that maps the hash of a chromosome to the
+    class predicted by the blackbox
+    """
+
+    def __init__(self, maxsize: int = 2**16) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._table = OrderedDict()
+
+    def predict(self, blackbox, chromosomes: np.ndarray) -> np.ndarray:
+        keys = digest(chromosomes).tolist()
+
+        labels = [None] * len(keys)
+        missing = {}
+        for i, k in enumerate(keys):
+            if k in self._table:
+                self._table.move_to_end(k)
+                labels[i] = self._table[k]
+            else:
+                missing.setdefault(k, []).append(i)
+
+        if len(missing) > 0:
+            first = [rows[0] for rows in missing.values()]
+            predictions = blackbox.predict(chromosomes[first])
+            for (k, rows), label in zip(missing.items(), predictions):
+                self._table[k] = label
+                for i in rows:
+                    labels[i] = label
+
+            while len(self._table) > self.maxsize:
+                self._table.popitem(last=False)
+
+        self.misses += len(missing)
+        self.hits += len(keys) - len(missing)
+
+        return np.asarray(labels)
+
+    def close(self) -> None:
+        self._table.clear()
+
+
+class SharedPredictionCache:
+    """
+    Prediction cache stored in a shared memory table, so that every
+    worker of a pool sees the predictions made by the others.
+
+    The table is set associative: a chromosome can only live in the
+    `probes` slots following its hash and, when they are all taken, the
+    least recently used one is evicted. Class labels must be integers.
+    """
+
+    def __init__(self, capacity: int = 2**16, probes: int = 8) -> None:
+        self.capacity = capacity
+        self.probes = probes
+        self._lock = mp.Lock()
+
+        # keys, labels, access stamps and the counters (tick, hits, misses)
+        size = (3 * capacity + 3) * np.dtype(np.int64).itemsize
+        self._shm = shared_memory.SharedMemory(create=True, size=size)
+        self._owner = True
+        self._map()
+        self._keys[:] = 0
+        self._stamps[:] = 0
+        self._counters[:] = 0
+
+        _attached[self.name] = self
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    @property
+    def hits(self) -> int:
+        return int(self._counters[1])
+
+    @property
+    def misses(self) -> int:
+        return int(self._counters[2])
+
+    def _map(self) -> None:
+        buffer = self._shm.buf
+        c = self.capacity
+        self._keys = np.ndarray((c,), dtype=np.uint64, buffer=buffer)
+        self._labels = np.ndarray((c,), dtype=np.int64, buffer=buffer, offset=8 * c)
+        self._stamps = np.ndarray((c,), dtype=np.int64, buffer=buffer, offset=16 * c)
+        self._counters = np.ndarray((3,), dtype=np.int64, buffer=buffer, offset=24 * c)
+        self._offsets = np.arange(self.probes, dtype=np.uint64)
+
+    def _slots(self, keys: np.ndarray) -> np.ndarray:
+        return (keys[:, None] + self._offsets) % np.uint64(self.capacity)
+
+    def _lookup(self, keys: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        slots = self._slots(keys)
+        match = self._keys[slots] == keys[:, None]
+        found = match.any(axis=1)
+        slot = slots[np.arange(len(keys)), match.argmax(axis=1)]
+
+        self._counters[0] += 1
+        self._stamps[slot[found]] = self._counters[0]
+
+        return self._labels[slot], found
+
+    def _insert(self, keys: np.ndarray, labels: np.ndarray) -> None:
+        slots = self._slots(keys)
+        stamps = self._stamps[slots]
+
+        # reuse the slot of the same key, otherwise evict the oldest one
+        stamps[self._keys[slots] == keys[:, None]] = -1
+        slot = slots[np.arange(len(keys)), stamps.argmin(axis=1)]
+
+        self._counters[0] += 1
+        self._keys[slot] = keys
+        self._labels[slot] = labels
+        self._stamps[slot] = self._counters[0]
+
+    def predict(self, blackbox, chromosomes: np.ndarray) -> np.ndarray:
+        keys = digest(chromosomes)
+        with self._lock:
+            labels, found = self._lookup(keys)
+
+        missing = np.flatnonzero(~found)
+        if len(missing) > 0:
+            # duplicates in the same chunk are predicted only once
+            unique, first, inverse = np.unique(
+                keys[missing], return_index=True, return_inverse=True
+            )
+            predictions = np.asarray(blackbox.predict(chromosomes[missing[first]]))
+            labels[missing] = predictions[inverse]
+            with self._lock:
+                self._insert(unique, predictions)
+        else:
+            unique = missing
+
+        with self._lock:
+            self._counters[1] += len(keys) - len(unique)
+            self._counters[2] += len(unique)
+
+        return labels
+
+    def close(self) -> None:
+        _attached.pop(self.name, None)
+        self._keys = self._labels = self._stamps = self._counters = None
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+
+    def __getstate__(self) -> dict:
+        # the lock can only travel while a new process is spawned, otherwise
+        # the cache already attached to the receiving process is looked up
+        spawning = context.get_spawning_popen() is not None
+        return {
+            "name": self.name,
+            "capacity": self.capacity,
+            "probes": self.probes,
+            "lock": self._lock if spawning else None,
+        }
+
+    def __setstate__(self, state: dict) -> None:
+        attached = _attached.get(state["name"])
+        if attached is not None:
+            self.__dict__.update(attached.__dict__)
+            return
+
+        if state["lock"] is None:
+            raise RuntimeError(f"shared cache {state['name']} is not attached")
+
+        self.capacity = state["capacity"]
+        self.probes = state["probes"]
+        self._lock = state["lock"]
+        self._shm = shared_memory.SharedMemory(name=state["name"])
+        self._owner = False
+        self._map()
+
+        _attached[self.name] = self
+
+
+def attach(cache: PredictionCache | SharedPredictionCache | None) -> None:
+    """
+    Pool initializer that makes a shared cache available to the worker
+    """
+    if isinstance(cache, SharedPredictionCache):
+        _attached.setdefault(cache.name, cache)
@@ -0,0 +1,896 @@
+import functools
+import random
+import time
+
+import numpy as np
+import pandas as pd
+
+from neighborhood_generator import cache as caching
+from neighborhood_generator import parallel, profiling, scheduling
+from neighborhood_generator import termination as stopping
+from neighborhood_generator.population import Population
+from neighborhood_generator.surrogate import Surrogate
+from ppga import base, log
+
+logger = log.getUserLogger()
+
+
+class ToolBox(base.ToolBox):
+    """
+    ToolBox that, besides the per individual operators, accepts population
+    level ones working on a 2-D chromosomes matrix: evaluation, selection,
+    crossover and mutation
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._batch_weights = np.array([1.0])
+        self._batch_evaluation = None
+        self._batch_selection = None
+        self._batch_crossover = None
+        self._batch_mutation = None
+
+    def set_weights(self, weights: tuple) -> None:
+        super().set_weights(weights)
+        self._batch_weights = np.asarray(weights, dtype=float)
+
+    def set_batch_evaluation(self, func, *args, **kwargs) -> None:
+        """
+        Sets a function that takes an (n, features) chromosomes matrix and
+        returns the (n, values) matrix of their values
+        """
+        self._batch_evaluation = functools.partial(func, *args, **kwargs)
+
+    def set_batch_selection(self, func, *args, **kwargs) -> None:
+        """
+        Sets a function that takes the fitness vector of the population and
+        the number of individuals to select and returns their indices
+        """
+        self._batch_selection = functools.partial(func, *args, **kwargs)
+
+    def set_batch_crossover(self, func, *args, **kwargs) -> None:
+        """
+        Sets a function that takes two (n, features) parents matrices and a
+        mask of the rows to cross and returns the two offspring matrices
+        """
+        self._batch_crossover = functools.partial(func, *args, **kwargs)
+
+    def set_batch_mutation(self, func, *args, **kwargs) -> None:
+        """
+        Sets a function that takes an (n, features) chromosomes matrix and a
+        mask of the rows to mutate and returns the mutated matrix
+        """
+        self._batch_mutation = functools.partial(func, *args, **kwargs)
+
+    @property
+    def batch_weights(self) -> np.ndarray:
+        return self._batch_weights
+
+    @property
+    def batch_operators(self) -> bool:
+        return (
+            self._batch_selection is not None
+            and self._batch_crossover is not None
+            and self._batch_mutation is not None
+        )
+
+    def batch_select(self, fitness: np.ndarray, n: int) -> np.ndarray:
+        return self._batch_selection(fitness, n)
+
+    def batch_crossover(
+        self, first: np.ndarray, second: np.ndarray, mask: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        return self._batch_crossover(first, second, mask)
+
+    def batch_mutate(self, chromosomes: np.ndarray, mask: np.ndarray) -> np.ndarray:
+        return self._batch_mutation(chromosomes, mask)
+
+    def batch_values(self, chromosomes: np.ndarray) -> np.ndarray:
+        """
+        Returns the (n, values) matrix of a chunk of chromosomes. Falls back
+        to the per individual evaluation if no batch evaluator is set.
+        """
+        if self._batch_evaluation is None:
+            values = [self.evaluate(c)[0] for c in chromosomes]
+            return np.asarray(values, dtype=float).reshape(len(chromosomes), -1)
+
+        values = np.asarray(self._batch_evaluation(chromosomes), dtype=float)
+
+        return values.reshape(len(chromosomes), -1)
+
+    def batch_evaluate(self, chromosomes: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Evaluates a chunk of chromosomes at once and returns their values
+        and fitness
+        """
+        values = self.batch_values(chromosomes)
+
+        return values, values @ self._batch_weights
+
+
+class Statistics:
+    """
+    Per generation statistics of a genetic run, with the same keys
+    exported by `ppga.base.Statistics`, the evaluations saved by the
+    removal of duplicate offspring, the accuracy of the surrogate and the
+    share of offspring it skipped, the sub-chunk size used to send the
+    offspring to the workers and the generation at which the run stopped.
+    The `calibration` of a run with automatic workers is its decision, see
+    `scheduling.calibrate`.
+
+    With `profile` it also keeps the time of every phase of a generation
+    and the compute and idle time of every worker, see `phases` and
+    `workers`.
+    """
+
+    def __init__(self, profile: bool = False) -> None:
+        self.profile = profiling.Profile() if profile else None
+        self.evals = []
+        self.max = []
+        self.mean = []
+        self.min = []
+        self.diversity = []
+        self.times = []
+        self.hits = []
+        self.misses = []
+        self.chunks = []
+        self.saved = []
+        self.accuracy = []
+        self.skipped = []
+        self.stop_generation = 0
+        self.calibration = None
+
+    def record(
+        self,
+        fitness: np.ndarray,
+        chromosomes: np.ndarray,
+        evals: int,
+        elapsed: float,
+        hits: int = 0,
+        misses: int = 0,
+        chunk: int = 0,
+        saved: int = 0,
+        accuracy: float = np.nan,
+        skipped: float = 0.0,
+    ):
+        """
+        Records a generation given the fitness vector and the chromosomes
+        matrix of its population
+        """
+        self.evals.append(evals)
+        self.max.append(float(fitness.max()))
+        self.mean.append(float(fitness.mean()))
+        self.min.append(float(fitness.min()))
+        self.diversity.append(len(np.unique(chromosomes, axis=0)) / len(fitness))
+        self.times.append(elapsed)
+        self.hits.append(hits)
+        self.misses.append(misses)
+        self.chunks.append(chunk)
+        self.saved.append(saved)
+        self.accuracy.append(accuracy)
+        self.skipped.append(skipped)
+        self.stop_generation = len(self.evals)
+
+    def to_dict(self) -> dict[str, list]:
+        return {
+            "evals": self.evals,
+            "max": self.max,
+            "mean": self.mean,
+            "min": self.min,
+            "diversity": self.diversity,
+            "time": self.times,
+            "hits": self.hits,
+            "misses": self.misses,
+            "chunk": self.chunks,
+            "saved": self.saved,
+            "accuracy": self.accuracy,
+            "skipped": self.skipped,
+            "stop_generation": self.stop_generation,
+        }
+
+    def phases(self) -> pd.DataFrame:
+        """
+        Returns a row per generation and phase with its wall clock seconds
+        """
+        assert self.profile is not None, "statistics recorded without profile"
+        return self.profile.to_frame()
+
+    def workers(self) -> pd.DataFrame:
+        """
+        Returns a row per generation and worker with its compute and idle
+        seconds
+        """
+        assert self.profile is not None, "statistics recorded without profile"
+        return self.profile.workers_frame()
+
+
+def scatter(func, chromosomes: np.ndarray, pool=None, workers_num: int = 1):
+    """
+    Applies `func` to the chromosomes matrix splitting it in one chunk per
+    worker and joins the resulting matrices
+    """
+    if pool is None or workers_num <= 1:
+        return func(chromosomes)
+
+    return pool.scatter(func, chromosomes)
+
+
+def evaluate(
+    toolbox: ToolBox, chromosomes: np.ndarray, pool=None, workers_num: int = 1
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Evaluates the chromosomes matrix splitting it in one chunk per worker
+    """
+    values = scatter(toolbox.batch_values, chromosomes, pool, workers_num)
+
+    return values, values @ toolbox.batch_weights
+
+
+def chunk_size(pool) -> int:
+    return 0 if pool is None else pool.chunk_size
+
+
+def counters(cache) -> tuple[int, int]:
+    if cache is None:
+        return 0, 0
+
+    return cache.hits, cache.misses
+
+
+def open_pool(
+    toolbox: ToolBox,
+    pool: parallel.Pool | None,
+    workers_num: int,
+    transport: str = "queue",
+    cache=None,
+    chunk_size: int | None = None,
+) -> tuple[parallel.Pool | None, bool]:
+    """
+    Returns the pool of a run and whether the run owns it. An external
+    pool, that can serve many runs, only receives the evaluation function
+    of the toolbox, and only if it changed since the last run; it has to
+    be started with the `cache` of the runs attached. Otherwise a new pool
+    of `workers_num` workers is started, if more than one, with the given
+    sub-chunk size or an adaptive one.
+    """
+    own_pool = pool is None
+    if own_pool and workers_num > 1:
+        pool = parallel.Pool(
+            workers_num,
+            transport,
+            initializer=caching.attach,
+            initargs=(cache,),
+            chunk_size=chunk_size,
+        )
+    if pool is not None:
+        pool.share("batch_values", toolbox.batch_values)
+
+    return pool, own_pool and pool is not None
+
+
+def sample_cost(toolbox: ToolBox, chromosomes: np.ndarray) -> float:
+    """
+    Returns the time of a single evaluation measured on mutated copies of
+    the chromosomes and without the prediction cache, so that neither
+    duplicates nor cache hits make the evaluation look cheaper
+    """
+    sample = np.array(chromosomes, dtype=float)
+    if toolbox.batch_operators:
+        sample = toolbox.batch_mutate(sample, np.ones(len(sample), dtype=bool))
+
+    values = toolbox.batch_values
+    batch_evaluation = toolbox._batch_evaluation
+    if batch_evaluation is not None and "cache" in batch_evaluation.keywords:
+        values = functools.partial(batch_evaluation, cache=None)
+
+    return scheduling.measure_eval_cost(values, sample, repeats=1)
+
+
+def calibrate_pool(
+    toolbox: ToolBox,
+    chromosomes: np.ndarray,
+    transport: str = "queue",
+    cache=None,
+) -> tuple[parallel.Pool | None, dict[str, float]]:
+    """
+    Starts the pool of the workers chosen for the evaluation cost measured
+    on a sample like the `chromosomes` of the first generation, if more
+    than one, with the chosen sub-chunk size, and logs the decision
+    """
+    decision = scheduling.calibrate(chromosomes, sample_cost(toolbox, chromosomes))
+    logger.info(
+        f"auto workers: {decision['workers']}, "
+        f"sub-chunks of {decision['chunk_size']}, "
+        f"predicted speedup {decision['speedup']:.2f}x "
+        f"(evaluation {decision['eval_cost'] * 1e6:.1f} us, "
+        f"latency {decision['latency'] * 1e3:.2f} ms)"
+    )
+
+    pool, _ = open_pool(
+        toolbox, None, decision["workers"], transport, cache, decision["chunk_size"]
+    )
+
+    return pool, decision
+
+
+def initial(
+    toolbox: ToolBox, population_size: int, seeds: np.ndarray | None = None
+) -> np.ndarray:
+    """
+    Returns the chromosomes of the initial population: the given seeds, if
+    any, and generated ones for the rest of the population
+    """
+    seeds = [] if seeds is None else list(seeds[:population_size])
+    generated = []
+    if population_size > len(seeds):
+        generated = toolbox.generate(population_size - len(seeds))
+
+    return np.asarray(seeds + [ind.chromosome for ind in generated])
+
+
+def mating(
+    toolbox: ToolBox, selected: list[base.Individual], cxpb: float, mutpb: float
+) -> tuple[list[base.Individual], list[np.ndarray]]:
+    """
+    Applies crossover and mutation to the selected individuals. Returns
+    the unchanged offspring, that keep their fitness, and the chromosomes
+    of the new ones that need an evaluation.
+    """
+    unchanged = []
+    chromosomes = []
+    for i in range(0, len(selected), 2):
+        couple = selected[i : i + 2]
+        offspring = [ind.chromosome.copy() for ind in couple]
+        changed = [False] * len(couple)
+
+        if len(couple) == 2 and random.random() < cxpb:
+            offspring = list(toolbox.crossover(offspring[0], offspring[1]))
+            changed = [True, True]
+
+        for j in range(len(offspring)):
+            if random.random() < mutpb:
+                offspring[j] = toolbox.mutate(offspring[j])
+                changed[j] = True
+
+        for ind, c, modified in zip(couple, offspring, changed):
+            if modified:
+                chromosomes.append(c)
+            else:
+                unchanged.append(ind)
+
+    return unchanged, chromosomes
+
+
+def batch_mating(
+    toolbox: ToolBox, chromosomes: np.ndarray, cxpb: float, mutpb: float
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Same as `mating` on the whole matrix of the selected chromosomes, with
+    the population level operators of the toolbox. Returns the offspring
+    matrix and the mask of the rows that changed.
+    """
+    n = len(chromosomes)
+    couples = n // 2
+    first = slice(0, 2 * couples, 2)
+    second = slice(1, 2 * couples, 2)
+
+    crossed = np.random.random(couples) < cxpb
+    offspring = chromosomes.copy()
+    offspring[first], offspring[second] = toolbox.batch_crossover(
+        chromosomes[first], chromosomes[second], crossed
+    )
+
+    changed = np.zeros(n, dtype=bool)
+    changed[first] = crossed
+    changed[second] = crossed
+
+    mutated = np.random.random(n) < mutpb
+    offspring = toolbox.batch_mutate(offspring, mutated)
+
+    return offspring, changed | mutated
+
+
+def breed(
+    toolbox: ToolBox,
+    population: Population,
+    n: int,
+    cxpb: float,
+    mutpb: float,
+    profile: profiling.Profile | None = None,
+) -> Population:
+    """
+    Selects `n` individuals and mates them, with the population level
+    operators when the toolbox has them. The offspring keeps the
+    evaluation of the rows that did not change, the others are invalid.
+    """
+    if not toolbox.batch_operators:
+        with profiling.phase(profile, "selection"):
+            selected = toolbox.select(population.individuals(), n)
+        with profiling.phase(profile, "mating"):
+            unchanged, chromosomes = mating(toolbox, selected, cxpb, mutpb)
+        return Population.concatenate(
+            [Population.from_individuals(unchanged), Population(chromosomes)]
+        )
+
+    with profiling.phase(profile, "selection"):
+        offspring = population.take(toolbox.batch_select(population.fitness, n))
+    with profiling.phase(profile, "mating"):
+        offspring.chromosomes, changed = batch_mating(
+            toolbox, offspring.chromosomes, cxpb, mutpb
+        )
+        offspring.valid &= ~changed
+
+    return offspring
+
+
+def evaluate_invalid(
+    toolbox: ToolBox,
+    population: Population,
+    pool=None,
+    workers_num: int = 1,
+    dedupe: bool = False,
+    profile: profiling.Profile | None = None,
+) -> int:
+    """
+    Evaluates the invalid rows of the population and returns the number
+    of evaluations. With `dedupe` every distinct chromosome is evaluated
+    once and its evaluation is copied to the duplicates.
+    """
+    invalid = population.invalid()
+    if len(invalid) == 0:
+        return 0
+
+    start = time.perf_counter()
+    chromosomes = population.chromosomes[invalid]
+    inverse = None
+    if dedupe:
+        chromosomes, inverse = np.unique(chromosomes, axis=0, return_inverse=True)
+        inverse = inverse.reshape(-1)
+
+    values, fitness = evaluate(toolbox, chromosomes, pool, workers_num)
+    if inverse is None:
+        population.assign(invalid, values, fitness)
+    else:
+        population.assign(invalid, values[inverse], fitness[inverse])
+
+    if profile is not None:
+        elapsed = time.perf_counter() - start
+        if pool is None or workers_num <= 1:
+            profile.add("compute", elapsed)
+        else:
+            # the slowest worker is the compute on the critical path
+            timing = pool.timing
+            compute = timing["computes"].max()
+            profile.add("dispatch", timing["dispatch"])
+            profile.add("compute", min(compute, timing["wait"]))
+            profile.add("transfer", max(0.0, timing["wait"] - compute))
+            profile.add("collection", elapsed - timing["dispatch"] - timing["wait"])
+            profile.add_workers(timing["computes"], timing["dispatch"] + timing["wait"])
+
+    return len(chromosomes)
+
+
+def step(
+    toolbox: ToolBox,
+    population: Population,
+    elite_size: int,
+    cxpb: float,
+    mutpb: float,
+    pool=None,
+    workers_num: int = 1,
+    dedupe: bool = False,
+    surrogate: Surrogate | None = None,
+    profile: profiling.Profile | None = None,
+) -> tuple[Population, int, int, float]:
+    """
+    Runs a generation: keeps the elite, breeds the rest of the population
+    and evaluates the new offspring, once per distinct chromosome with
+    `dedupe`. The offspring skipped by the `surrogate`, if any, are
+    replaced by the best individuals after the elite. Returns the next
+    population, the number of evaluations, the number of evaluations
+    saved and the time spent evaluating. The time of every phase is added
+    to the `profile`, if any.
+    """
+    with profiling.phase(profile, "selection"):
+        ranking = population.ranking()
+        elite = population.take(ranking[:elite_size])
+    offspring = breed(
+        toolbox, population, len(population) - elite_size, cxpb, mutpb, profile
+    )
+    if surrogate is not None:
+        offspring = surrogate.screen(offspring)
+
+    start = time.perf_counter()
+    invalid = offspring.invalid()
+    evals = evaluate_invalid(toolbox, offspring, pool, workers_num, dedupe, profile)
+    elapsed = time.perf_counter() - start
+
+    if surrogate is not None:
+        surrogate.learn(offspring.chromosomes[invalid], offspring.fitness[invalid])
+    with profiling.phase(profile, "replacement"):
+        fill = len(population) - elite_size - len(offspring)
+        survivors = population.take(ranking[elite_size : elite_size + fill])
+        population = Population.concatenate([elite, survivors, offspring])
+
+    return population, evals, len(invalid) - evals, elapsed
+
+
+def simple(
+    toolbox: ToolBox,
+    population_size: int,
+    keep: float = 0.1,
+    cxpb: float = 0.8,
+    mutpb: float = 0.2,
+    max_generations: int = 50,
+    hall_of_fame: base.HallOfFame | None = None,
+    workers_num: int | str = 1,
+    cache=None,
+    termination: list[stopping.Criterion] | None = None,
+    seeds: np.ndarray | None = None,
+    transport: str = "queue",
+    dedupe: bool = False,
+    surrogate: Surrogate | None = None,
+    profile: bool = False,
+    pool: parallel.Pool | None = None,
+) -> tuple[Population, Statistics]:
+    """
+    Generational genetic algorithm with elitism, same as
+    `ppga.algorithms.simple`, in which the offspring of every generation
+    is evaluated as a 2-D chromosomes matrix, one chunk per worker.
+    The population is kept as a structure of arrays and elitism and
+    replacement work on index arrays.
+
+    The prediction `cache` used by the evaluation, if any, is attached to
+    the workers and its hits and misses are recorded in the statistics.
+    The `transport` of the chunks to the workers is one of
+    `parallel.TRANSPORTS`. The run ends after `max_generations` or as soon as one of the
+    `termination` criteria is met. The `seeds` chromosomes, if given, take
+    the place of part of the generated initial population. With `dedupe`
+    the duplicate offspring of a generation are evaluated once, the saved
+    evaluations are recorded in the statistics. With a `surrogate` only
+    the most promising offspring are evaluated, see `Surrogate`. With
+    `profile` the statistics also keep the time of every phase of every
+    generation and the compute and idle time of every worker.
+
+    An external `pool`, owned by the caller, is reused instead of starting
+    `workers_num` new workers, see `open_pool`. With `workers_num="auto"`
+    the initial population is evaluated in this process and the cost of
+    the evaluation, measured on a varied sample, with the one of the IPC
+    chooses the workers of the rest of the run, see `calibrate_pool`.
+    """
+    stats = Statistics(profile)
+    stopping.start(termination)
+    auto = workers_num == "auto"
+    pool, own_pool = open_pool(
+        toolbox, pool, 1 if auto else workers_num, transport, cache
+    )
+    workers_num = pool.workers_num if pool is not None else 1
+
+    try:
+        # initial population
+        population = Population(initial(toolbox, population_size, seeds))
+        evaluate_invalid(toolbox, population, pool, workers_num, dedupe)
+        if auto and pool is None:
+            pool, stats.calibration = calibrate_pool(
+                toolbox, population.chromosomes, transport, cache
+            )
+            own_pool = pool is not None
+            workers_num = pool.workers_num if pool is not None else 1
+        if hall_of_fame is not None:
+            hall_of_fame.update(population)
+        if surrogate is not None:
+            surrogate.learn(population.chromosomes, population.fitness)
+
+        hits, misses = counters(cache)
+
+        elite_size = int(keep * population_size)
+        for _ in range(max_generations):
+            population, evals, saved, elapsed = step(
+                toolbox,
+                population,
+                elite_size,
+                cxpb,
+                mutpb,
+                pool,
+                workers_num,
+                dedupe,
+                surrogate,
+                stats.profile,
+            )
+            if hall_of_fame is not None:
+                with profiling.phase(stats.profile, "hall_of_fame"):
+                    hall_of_fame.update(population)
+            if stats.profile is not None:
+                stats.profile.next_generation()
+
+            total_hits, total_misses = counters(cache)
+            stats.record(
+                population.fitness,
+                population.chromosomes,
+                evals,
+                elapsed,
+                total_hits - hits,
+                total_misses - misses,
+                chunk_size(pool),
+                saved,
+                np.nan if surrogate is None else surrogate.accuracy,
+                0.0 if surrogate is None else surrogate.skipped,
+            )
+            hits, misses = total_hits, total_misses
+
+            if stopping.stop(termination, stats, hall_of_fame):
+                break
+    except BaseException:
+        if own_pool:
+            pool.terminate()
+        raise
+
+    if own_pool:
+        pool.close()
+        pool.join()
+
+    return population, stats
+
+
+def steady_state(
+    toolbox: ToolBox,
+    population_size: int,
+    batch_size: int,
+    max_evaluations: int,
+    cxpb: float = 0.8,
+    mutpb: float = 0.2,
+    hall_of_fame: base.HallOfFame | None = None,
+    workers_num: int = 1,
+    cache=None,
+    termination: list[stopping.Criterion] | None = None,
+    report_every: int | None = None,
+) -> tuple[Population, Statistics]:
+    """
+    Asynchronous steady-state genetic algorithm: every worker evaluates
+    a batch of `batch_size` offspring and, as soon as any batch comes
+    back, it replaces the worst individuals of the population, new
+    parents are selected and the worker gets a new batch. There is no
+    generation barrier, so no worker waits for the slowest one.
+
+    The statistics get a row every `report_every` evaluations, by default
+    the population size, and the `termination` criteria are checked on
+    every row. The run ends after `max_evaluations`.
+    """
+    if report_every is None:
+        report_every = population_size
+
+    stats = Statistics()
+    stopping.start(termination)
+    pool = None
+    if workers_num > 1:
+        pool = parallel.Pool(workers_num, initializer=caching.attach, initargs=(cache,))
+
+    try:
+        population = Population(initial(toolbox, population_size))
+        evaluate_invalid(toolbox, population, pool, workers_num)
+        if hall_of_fame is not None:
+            hall_of_fame.update(population)
+
+        def offspring() -> Population:
+            # new individuals only, the unchanged ones are copies of parents,
+            # unless the operators changed none of them
+            batch = breed(toolbox, population, batch_size, cxpb, mutpb)
+            changed = batch.invalid()
+            if len(changed) > 0:
+                return batch.take(changed)
+
+            return batch
+
+        hits, misses = counters(cache)
+        evals, reported, elapsed = 0, 0, 0.0
+        in_flight = {}
+        task = 0
+        if pool is not None:
+            for worker in range(workers_num):
+                in_flight[task] = (worker, offspring())
+                pool.submit(
+                    worker, task, toolbox.batch_values, in_flight[task][1].chromosomes
+                )
+                task += 1
+
+        start = time.perf_counter()
+        while evals < max_evaluations:
+            if pool is None:
+                batch = offspring()
+                values, fitness = evaluate(toolbox, batch.chromosomes)
+            else:
+                done, values = pool.receive()
+                worker, batch = in_flight.pop(done)
+                fitness = values @ toolbox.batch_weights
+            batch.assign(np.arange(len(batch)), values, fitness)
+            evals += len(batch)
+
+            # replacement of the worst individuals
+            population = Population.concatenate([population, batch])
+            population = population.take(population.ranking()[:population_size])
+            if hall_of_fame is not None:
+                hall_of_fame.update(batch)
+
+            if (
+                pool is not None
+                and evals + len(in_flight) * batch_size < max_evaluations
+            ):
+                in_flight[task] = (worker, offspring())
+                pool.submit(
+                    worker, task, toolbox.batch_values, in_flight[task][1].chromosomes
+                )
+                task += 1
+
+            if evals - reported >= report_every or evals >= max_evaluations:
+                elapsed = time.perf_counter() - start
+                total_hits, total_misses = counters(cache)
+                stats.record(
+                    population.fitness,
+                    population.chromosomes,
+                    evals - reported,
+                    elapsed,
+                    total_hits - hits,
+                    total_misses - misses,
+                    batch_size,
+                )
+                hits, misses = total_hits, total_misses
+                reported = evals
+                start = time.perf_counter()
+
+                if stopping.stop(termination, stats, hall_of_fame):
+                    break
+    except BaseException:
+        if pool is not None:
+            pool.terminate()
+        raise
+
+    if pool is not None:
+        # the batches still in flight are discarded
+        for _ in in_flight:
+            pool.receive()
+        pool.close()
+        pool.join()
+
+    return population, stats
+
+
+def scored(
+    chromosomes: np.ndarray, values: np.ndarray, target: int, weight: float
+) -> Population:
+    """
+    Builds the population scored on the `target` column of the values
+    """
+    return Population(
+        chromosomes,
+        values[:, target : target + 1],
+        values[:, target] * weight,
+        np.ones(len(chromosomes), dtype=bool),
+    )
+
+
+def on_target(population: Population, target: int, weight: float) -> Population:
+    """
+    Returns a copy of the population ranked on the `target` column of its
+    values, which are all kept
+    """
+    ranked = population.take(np.arange(len(population)))
+    ranked.fitness = ranked.values[:, target] * weight
+
+    return ranked
+
+
+def multi_target(
+    toolbox: ToolBox,
+    population_size: int,
+    keep: float,
+    cxpb: float,
+    mutpb: float,
+    max_generations: int,
+    hall_of_fames: list[base.HallOfFame],
+    workers_num: int = 1,
+    cache=None,
+    termination: list[stopping.Criterion] | None = None,
+    seeds: list[np.ndarray] | None = None,
+    transport: str = "queue",
+    pool: parallel.Pool | None = None,
+) -> tuple[Population, list[Statistics]]:
+    """
+    Evolves a single population of `population_size` individuals scored on
+    every column returned by the batch evaluator, that is on every target,
+    so a generation costs the evaluation of one population whatever the
+    number of targets.
+
+    Every target breeds its share of the next generation, elites included,
+    from the whole population ranked on its column. Each hall of fame
+    receives the whole population scored on its target, and every target
+    gets its statistics, where times and cache counters are the shared
+    ones. The workers, their `transport` and the external `pool` are the
+    same of `simple`.
+    The run stops early when the `termination` criteria are met for all
+    the targets. The `seeds`, if given, are the initial chromosomes of the
+    share of every target.
+    """
+    targets = len(hall_of_fames)
+    weight = float(toolbox.batch_weights[0])
+    stats = [Statistics() for _ in range(targets)]
+    stopping.start(termination)
+    pool, own_pool = open_pool(toolbox, pool, workers_num, transport, cache)
+    workers_num = pool.workers_num if pool is not None else 1
+
+    shares = [
+        population_size // targets + (t < population_size % targets)
+        for t in range(targets)
+    ]
+
+    try:
+        # initial population, a share for every target
+        if seeds is None:
+            seeds = [None] * targets
+        chromosomes = np.concatenate(
+            [initial(toolbox, shares[t], seeds[t]) for t in range(targets)]
+        )
+        values = scatter(toolbox.batch_values, chromosomes, pool, workers_num)
+        population = Population(
+            chromosomes, values, values[:, 0] * weight, np.ones(len(values), bool)
+        )
+        for t in range(targets):
+            hall_of_fames[t].update(scored(chromosomes, values, t, weight))
+
+        hits, misses = counters(cache)
+
+        for _ in range(max_generations):
+            elites = []
+            offspring = []
+            for t in range(targets):
+                ranked = on_target(population, t, weight)
+                elite_size = int(keep * shares[t])
+                elites.append(ranked.take(ranked.ranking()[:elite_size]))
+                offspring.append(
+                    breed(toolbox, ranked, shares[t] - elite_size, cxpb, mutpb)
+                )
+            evals = [len(o.invalid()) for o in offspring]
+            population = Population.concatenate(elites + offspring)
+
+            start = time.perf_counter()
+            invalid = population.invalid()
+            if len(invalid) > 0:
+                values = scatter(
+                    toolbox.batch_values,
+                    population.chromosomes[invalid],
+                    pool,
+                    workers_num,
+                )
+                population.assign(invalid, values, values[:, 0] * weight)
+            elapsed = time.perf_counter() - start
+
+            total_hits, total_misses = counters(cache)
+            for t in range(targets):
+                hall_of_fames[t].update(
+                    scored(population.chromosomes, population.values, t, weight)
+                )
+                stats[t].record(
+                    population.values[:, t] * weight,
+                    population.chromosomes,
+                    evals[t],
+                    elapsed,
+                    total_hits - hits,
+                    total_misses - misses,
+                    chunk_size(pool),
+                )
+            hits, misses = total_hits, total_misses
+
+            if termination and all(
+                stopping.stop(termination, stats[t], hall_of_fames[t])
+                for t in range(targets)
+            ):
+                break
+    except BaseException:
+        if own_pool:
+            pool.terminate()
+        raise
+
+    if own_pool:
+        pool.close()
+        pool.join()
+
+    return population, stats
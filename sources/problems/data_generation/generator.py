@@ -1,6 +1,14 @@
+import functools
+import random
+from collections import deque
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
+
 import genetic
 import numpy as np
 
+from neighborhood_generator import cache as caching
+from neighborhood_generator import parallel, registry, scheduling, warmstart
 from ppga import base
 
 
@@ -11,49 +19,287 @@ def build_neighborhood(
     blackbox,
     target: int,
     workers_num: int,
-) -> tuple[list, base.Statistics]:
+    cache=None,
+    criteria: list | None = None,
+    seeds: np.ndarray | None = None,
+    pool: parallel.Pool | None = None,
+) -> tuple[dict[str, np.ndarray], dict]:
     """
     Generates neighbors close to the given point and classified
-    as the label given with the `target` parameter
+    as the label given with the `target` parameter. The neighborhood
+    is returned as the arrays of the hall of fame.
     """
     # update the point for the generation
-    toolbox = genetic.update_toolbox(toolbox, point, target, blackbox)
-    hof, stats = genetic.run(toolbox, population_size, workers_num)
-    return hof.to_list(), stats.to_dict()
+    toolbox = genetic.update_toolbox(toolbox, point, target, blackbox, cache)
+    hof, stats = genetic.run(
+        toolbox, population_size, workers_num, cache, criteria, seeds, pool=pool
+    )
+    return hof.to_arrays(), stats.to_dict()
 
 
-def generate(
+def build_neighborhoods(
+    toolbox: base.ToolBox,
+    population_size: int,
+    point: np.ndarray,
+    blackbox,
+    targets: np.ndarray,
+    workers_num: int,
+    cache=None,
+    criteria: list | None = None,
+    seeds: list[np.ndarray] | None = None,
+    pool: parallel.Pool | None = None,
+) -> list[tuple[dict[str, np.ndarray], dict]]:
+    """
+    Generates the neighborhoods of the given point for all the `targets`
+    with a single genetic run, in the order of the targets
+    """
+    toolbox = genetic.update_toolbox_multi(toolbox, point, targets, blackbox, cache)
+    runs = genetic.run_multi(
+        toolbox,
+        population_size,
+        len(targets),
+        workers_num,
+        cache,
+        criteria,
+        seeds,
+        pool=pool,
+    )
+    return [(hof.to_arrays(), stats.to_dict()) for hof, stats in runs]
+
+
+def run_task(
+    point: np.ndarray,
+    targets: np.ndarray,
+    seeds: list[np.ndarray] | None,
+    toolbox: base.ToolBox,
+    population_size: int,
+    blackbox,
+    workers_num: int,
+    cache=None,
+    multi_target: bool = False,
+    criteria: list | None = None,
+    pool: parallel.Pool | None = None,
+) -> list[tuple[dict[str, np.ndarray], dict]]:
+    """
+    Generates the neighborhoods of the point for the given targets, with
+    a genetic run per target or a single multi target run. The `seeds`, if
+    any, are the initial chromosomes for every target. The runs share the
+    workers of the `pool`, if any.
+    """
+    if multi_target:
+        return build_neighborhoods(
+            toolbox,
+            population_size,
+            point,
+            blackbox,
+            targets,
+            workers_num,
+            cache,
+            criteria,
+            seeds,
+            pool,
+        )
+
+    if seeds is None:
+        seeds = [None] * len(targets)
+
+    return [
+        build_neighborhood(
+            toolbox,
+            population_size,
+            point,
+            blackbox,
+            target,
+            workers_num,
+            cache,
+            criteria,
+            target_seeds,
+            pool,
+        )
+        for target, target_seeds in zip(targets, seeds)
+    ]
+
+
+def split_workers(
+    toolbox: base.ToolBox,
+    X: np.ndarray,
+    model,
+    target: int,
+    population_size: int,
+    workers_num: int,
+    tasks: int,
+) -> tuple[int, int]:
+    """
+    Measures the evaluation and communication costs on a sample of the
+    dataset and chooses how many runs to execute concurrently and how many
+    workers to give to each of them
+    """
+    sample = X[np.random.randint(len(X), size=population_size)]
+    toolbox = genetic.update_toolbox(toolbox, X[0], target, model)
+    eval_cost = scheduling.measure_eval_cost(toolbox.batch_values, sample)
+    latency, byte_cost = scheduling.measure_ipc(sample)
+
+    return scheduling.plan(
+        tasks,
+        workers_num,
+        population_size,
+        X.shape[1],
+        eval_cost,
+        latency,
+        byte_cost,
+    )
+
+
+def start_worker(cache) -> None:
+    """
+    Initializer of the processes running whole genetic runs: attaches the
+    shared cache and reseeds the random generators, that forked processes
+    would otherwise share
+    """
+    caching.attach(cache)
+    np.random.seed()
+    random.seed()
+
+
+def auto_workers(
+    toolbox: base.ToolBox,
+    X: np.ndarray,
+    model,
+    target: int,
+    population_size: int,
+) -> int:
+    """
+    Chooses the workers of the runs from the evaluation and communication
+    costs measured on a sample of the dataset, see `scheduling.calibrate`
+    """
+    sample = X[np.random.randint(len(X), size=population_size)]
+    toolbox = genetic.update_toolbox(toolbox, X[0], target, model)
+    eval_cost = scheduling.measure_eval_cost(toolbox.batch_values, sample)
+
+    return scheduling.calibrate(sample, eval_cost)["workers"]
+
+
+def ordered_map(executor, func, *iterables, window: int):
+    """
+    Like `executor.map` but with at most `window` tasks in flight, so
+    finished results never pile up waiting for a slow one
+    """
+    pending = deque()
+    for args in zip(*iterables):
+        pending.append(executor.submit(func, *args))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+
+    while len(pending) > 0:
+        yield pending.popleft().result()
+
+
+def iter_generate(
     X: np.ndarray,
     y: np.ndarray,
     model,
     population_size: int,
-    workers_num: int = 0,
-) -> dict[str, list]:
+    workers_num: int | str = 0,
+    cache_size: int = 0,
+    multi_target: bool = False,
+    schedule: str = "inner",
+    criteria: list | None = None,
+    warm_start: float = 0.0,
+) -> Iterator[dict]:
     """
-    Generates synthetic neighbors for each point of the dataset.
-    A neighborhood is generated for every possible outcome.
+    Same as `generate` but yields the result of every (point, target) as
+    soon as it is ready, in input order
     """
+    assert schedule in ("inner", "outer", "auto")
+
     # collect all the possible outcomes
     outcomes = np.unique(y)
 
     # create a toolbox with fixed params
     toolbox = genetic.create_toolbox(X)
 
-    # dataset of results
-    results = []
+    if workers_num == "auto":
+        workers_num = auto_workers(toolbox, X, model, outcomes[0], population_size)
+
+    # predictions cache shared by every run
+    cache = None
+    if cache_size > 0 and (workers_num > 1 or schedule != "inner"):
+        cache = caching.SharedPredictionCache(cache_size)
+    elif cache_size > 0:
+        cache = caching.PredictionCache(cache_size)
+
+    # independent tasks, one per point or per (point, target)
+    tasks = []
     for point, label in zip(X, y):
-        for target in outcomes:
-            hof, stats = build_neighborhood(
-                toolbox,
-                population_size,
-                point,
-                model,
-                target,
-                workers_num,
+        if multi_target:
+            tasks.append((point, label, outcomes))
+        else:
+            tasks.extend(
+                (point, label, outcomes[t : t + 1]) for t in range(len(outcomes))
             )
 
-            results.append(
-                {
+    outer, inner = 1, workers_num
+    if schedule == "outer":
+        outer, inner = max(1, min(len(tasks), workers_num)), 1
+    elif schedule == "auto" and workers_num > 1:
+        outer, inner = split_workers(
+            toolbox, X, model, outcomes[0], population_size, workers_num, len(tasks)
+        )
+
+    # the workers receive only the key of the model, a serial run keeps it
+    key = None
+    if outer > 1 or inner > 1:
+        key = registry.register(model)
+
+    # the runs of the points one after the other share the same workers
+    pool = None
+    if outer == 1 and inner > 1:
+        pool = parallel.Pool(inner, initializer=caching.attach, initargs=(cache,))
+
+    task = functools.partial(
+        run_task,
+        toolbox=toolbox,
+        population_size=population_size,
+        blackbox=model if key is None else key,
+        workers_num=inner,
+        cache=cache,
+        multi_target=multi_target,
+        criteria=criteria,
+        pool=pool,
+    )
+    points = [point for point, _, _ in tasks]
+    targets = [targets for _, _, targets in tasks]
+
+    # the initial populations are seeded with the translated neighborhoods
+    # of the nearest points already explained, looked up lazily when every
+    # task is started
+    store = None
+    seeds = (None for _ in tasks)
+    if warm_start > 0.0:
+        store = warmstart.WarmStartStore(int(warm_start * population_size))
+        seeds = (
+            [store.seeds(point, t, store.members) for t in point_targets]
+            for point, _, point_targets in tasks
+        )
+
+    executor = None
+    try:
+        if outer > 1:
+            executor = ProcessPoolExecutor(
+                outer, initializer=start_worker, initargs=(cache,)
+            )
+            neighborhoods = ordered_map(
+                executor, task, points, targets, seeds, window=2 * outer
+            )
+        else:
+            neighborhoods = map(task, points, targets, seeds)
+
+        for (point, label, targets), runs in zip(tasks, neighborhoods):
+            for target, (hof, stats) in zip(targets, runs):
+                if store is not None:
+                    store.add(point, target, hof["chromosome"], hof["fitness"])
+
+                yield {
                     "point": point.tolist(),
                     "class": int(label),
                     "target": int(target),
@@ -61,6 +307,64 @@ def generate(
                     "neighborhood": hof,
                     "stats": stats,
                 }
-            )
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+        if pool is not None:
+            pool.close()
+            pool.join()
+        if cache is not None:
+            cache.close()
+        if key is not None:
+            registry.unregister(key)
+
+
+def generate(
+    X: np.ndarray,
+    y: np.ndarray,
+    model,
+    population_size: int,
+    workers_num: int | str = 0,
+    cache_size: int = 0,
+    multi_target: bool = False,
+    schedule: str = "inner",
+    criteria: list | None = None,
+    warm_start: float = 0.0,
+) -> dict[str, list]:
+    """
+    Generates synthetic neighbors for each point of the dataset.
+    A neighborhood is generated for every possible outcome.
+
+    With a positive `cache_size` the predictions of the model are cached
+    and shared by all the runs, and by all the workers of each run.
+    With `multi_target` the neighborhoods of a point for all the outcomes
+    come from a single genetic run, with one model call per generation.
 
-    return results
+    The `schedule` decides where the workers are spent: `inner` shares the
+    evaluation of every generation, `outer` runs independent (point,
+    target) tasks at the same time and `auto` measures the costs of the
+    workload and mixes the two. Results are always in input order. The
+    workers of `inner` are started once and serve all the runs. With
+    `workers_num="auto"` their number is chosen from the costs measured on
+    a sample of the dataset.
+
+    The termination `criteria`, if any, stop every run as soon as one of
+    them is met, see `termination`. With a positive `warm_start` that
+    fraction of every initial population is seeded with the neighborhood
+    of the nearest point already explained for the same target, translated
+    on the new point.
+    """
+    return list(
+        iter_generate(
+            X,
+            y,
+            model,
+            population_size,
+            workers_num,
+            cache_size,
+            multi_target,
+            schedule,
+            criteria,
+            warm_start,
+        )
+    )
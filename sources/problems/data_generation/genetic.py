@@ -3,7 +3,18 @@ import warnings
 import numpy as np
 from numpy import linalg, random
 
-from ppga import algorithms, base, tools
+from neighborhood_generator import (
+    adapters,
+    engine,
+    halloffame,
+    islands,
+    operators,
+    parallel,
+    registry,
+    termination,
+)
+from neighborhood_generator.surrogate import Surrogate
+from ppga import tools
 
 warnings.filterwarnings("ignore")
 
@@ -26,11 +37,16 @@ def evaluate(
     blackbox,
     epsilon: float = 0.0,
     alpha: float = 0.0,
+    cache=None,
 ):
     assert alpha >= 0.0 and alpha <= 1.0
 
-    # classification
-    synth_class = blackbox.predict(chromosome.reshape(1, -1))
+    # classification, the blackbox may be a registry key, through its adapter
+    blackbox = adapters.adapt(registry.resolve(blackbox))
+    if cache is None:
+        synth_class = blackbox.predict(chromosome.reshape(1, -1))
+    else:
+        synth_class = cache.predict(blackbox, chromosome.reshape(1, -1))
 
     # compute euclidean distance
     distance = linalg.norm(chromosome - point, ord=2)
@@ -45,22 +61,77 @@ def evaluate(
     return (distance / right_target,)
 
 
-def create_toolbox(X: np.ndarray) -> base.ToolBox:
+# batch evaluation against many targets
+def evaluate_targets(
+    chromosomes: np.ndarray,
+    point: np.ndarray,
+    targets: list[int],
+    blackbox,
+    epsilon: float = 0.0,
+    alpha: float = 0.0,
+    cache=None,
+) -> np.ndarray:
+    assert alpha >= 0.0 and alpha <= 1.0
+
+    # classification of the whole chunk through the adapter of the blackbox,
+    # that may be a registry key
+    blackbox = adapters.adapt(registry.resolve(blackbox))
+    if cache is None:
+        synth_classes = blackbox.predict(chromosomes)
+    else:
+        synth_classes = cache.predict(blackbox, chromosomes)
+
+    # compute euclidean distances
+    distances = linalg.norm(chromosomes - point, ord=2, axis=1)
+
+    # compute classification penalties, one column per target
+    hits = np.asarray(synth_classes)[:, None] == np.asarray(targets)[None, :]
+    right_targets = np.where(hits, 1.0 - alpha, alpha)
+
+    # check the epsilon distance
+    with np.errstate(divide="ignore", invalid="ignore"):
+        fitness = distances[:, None] / right_targets
+    fitness[distances <= epsilon] = np.inf
+
+    return fitness
+
+
+# batch evaluation with target
+def evaluate_batch(
+    chromosomes: np.ndarray,
+    point: np.ndarray,
+    target: int,
+    blackbox,
+    epsilon: float = 0.0,
+    alpha: float = 0.0,
+    cache=None,
+) -> np.ndarray:
+    return evaluate_targets(
+        chromosomes, point, [target], blackbox, epsilon, alpha, cache
+    )
+
+
+def create_toolbox(X: np.ndarray) -> engine.ToolBox:
     mu = X.mean(axis=0)
     sigma = X.std(axis=0)
 
-    toolbox = base.ToolBox()
+    toolbox = engine.ToolBox()
     toolbox.set_weights((-1.0,))
     toolbox.set_selection(tools.sel_tournament, tournsize=3)
     toolbox.set_crossover(tools.cx_one_point)
     toolbox.set_mutation(tools.mut_normal, mu=mu, sigma=sigma, indpb=0.8)
 
+    # same operators on the whole offspring matrix
+    toolbox.set_batch_selection(operators.sel_tournament, tournsize=3)
+    toolbox.set_batch_crossover(operators.cx_one_point)
+    toolbox.set_batch_mutation(operators.mut_normal, mu=mu, sigma=sigma, indpb=0.8)
+
     return toolbox
 
 
 def update_toolbox(
-    toolbox: base.ToolBox, point: np.ndarray, target: int, blackbox
-) -> base.ToolBox:
+    toolbox: engine.ToolBox, point: np.ndarray, target: int, blackbox, cache=None
+) -> engine.ToolBox:
     # update the toolbox with new generation and evaluation
     toolbox.set_generation(generate_copy, point=point)
 
@@ -71,17 +142,61 @@ def update_toolbox(
         blackbox=blackbox,
         epsilon=0.0,
         alpha=0.0,
+        cache=cache,
+    )
+
+    toolbox.set_batch_evaluation(
+        evaluate_batch,
+        point=point,
+        target=target,
+        blackbox=blackbox,
+        epsilon=0.0,
+        alpha=0.0,
+        cache=cache,
+    )
+
+    return toolbox
+
+
+def update_toolbox_multi(
+    toolbox: engine.ToolBox,
+    point: np.ndarray,
+    targets: list[int],
+    blackbox,
+    cache=None,
+) -> engine.ToolBox:
+    # update the toolbox to score every individual against all the targets
+    toolbox.set_generation(generate_copy, point=point)
+
+    toolbox.set_batch_evaluation(
+        evaluate_targets,
+        point=point,
+        targets=targets,
+        blackbox=blackbox,
+        epsilon=0.0,
+        alpha=0.0,
+        cache=cache,
     )
 
     return toolbox
 
 
 def run(
-    toolbox: base.ToolBox, population_size: int, workers_num: int
-) -> tuple[base.HallOfFame, base.Statistics]:
+    toolbox: engine.ToolBox,
+    population_size: int,
+    workers_num: int | str,
+    cache=None,
+    criteria: list[termination.Criterion] | None = None,
+    seeds: np.ndarray | None = None,
+    transport: str = "queue",
+    dedupe: bool = False,
+    surrogate: Surrogate | None = None,
+    profile: bool = False,
+    pool: parallel.Pool | None = None,
+) -> tuple[halloffame.HallOfFame, engine.Statistics]:
     # run the genetic algorithm on one point with a specific target class
-    hof = base.HallOfFame(population_size)
-    _, stats = algorithms.simple(
+    hof = halloffame.HallOfFame(population_size)
+    _, stats = engine.simple(
         toolbox=toolbox,
         population_size=population_size,
         keep=0.1,
@@ -90,6 +205,100 @@ def run(
         max_generations=50,
         hall_of_fame=hof,
         workers_num=workers_num,
+        cache=cache,
+        termination=criteria,
+        seeds=seeds,
+        transport=transport,
+        dedupe=dedupe,
+        surrogate=surrogate,
+        profile=profile,
+        pool=pool,
+    )
+
+    return hof, stats
+
+
+def run_steady(
+    toolbox: engine.ToolBox,
+    population_size: int,
+    workers_num: int,
+    cache=None,
+    criteria: list[termination.Criterion] | None = None,
+) -> tuple[halloffame.HallOfFame, engine.Statistics]:
+    # run the genetic algorithm on one point without generation barriers
+    hof = halloffame.HallOfFame(population_size)
+    _, stats = engine.steady_state(
+        toolbox=toolbox,
+        population_size=population_size,
+        batch_size=max(1, population_size // (4 * max(1, workers_num))),
+        max_evaluations=50 * population_size,
+        cxpb=0.8,
+        mutpb=0.2,
+        hall_of_fame=hof,
+        workers_num=workers_num,
+        cache=cache,
+        termination=criteria,
+    )
+
+    return hof, stats
+
+
+def run_multi(
+    toolbox: engine.ToolBox,
+    population_size: int,
+    targets_num: int,
+    workers_num: int,
+    cache=None,
+    criteria: list[termination.Criterion] | None = None,
+    seeds: list[np.ndarray] | None = None,
+    transport: str = "queue",
+    pool: parallel.Pool | None = None,
+) -> list[tuple[halloffame.HallOfFame, engine.Statistics]]:
+    # run the genetic algorithm on one point for all the target classes
+    hofs = [halloffame.HallOfFame(population_size) for _ in range(targets_num)]
+    _, stats = engine.multi_target(
+        toolbox=toolbox,
+        population_size=population_size,
+        keep=0.1,
+        cxpb=0.8,
+        mutpb=0.2,
+        max_generations=50,
+        hall_of_fames=hofs,
+        workers_num=workers_num,
+        cache=cache,
+        termination=criteria,
+        seeds=seeds,
+        transport=transport,
+        pool=pool,
+    )
+
+    return list(zip(hofs, stats))
+
+
+def run_islands(
+    toolbox: engine.ToolBox,
+    population_size: int,
+    islands_num: int,
+    topology: str = "ring",
+    transport: str = "pipe",
+    criteria: list[termination.Criterion] | None = None,
+) -> tuple[halloffame.HallOfFame, list[engine.Statistics]]:
+    # run the genetic algorithm on one point as islands of smaller populations
+    hof = halloffame.HallOfFame(population_size)
+    _, stats = islands.islands(
+        toolbox=toolbox,
+        population_size=population_size // islands_num,
+        islands_num=islands_num,
+        keep=0.1,
+        cxpb=0.8,
+        mutpb=0.2,
+        max_generations=50,
+        migration_interval=5,
+        migrants=max(1, population_size // (20 * islands_num)),
+        topology=topology,
+        transport=transport,
+        hall_of_fame=hof,
+        termination=criteria,
     )
 
     return hof, stats
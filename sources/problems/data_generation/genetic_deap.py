@@ -1,10 +1,15 @@
+import bisect
+import functools
+import heapq
 import multiprocessing as mp
+import multiprocessing.pool
+import time
 import warnings
 
 import numpy as np
 
 from deap import algorithms, base, creator, tools
-from neighborhood_generator import genetic
+from neighborhood_generator import engine, genetic, halloffame, termination
 
 warnings.filterwarnings("ignore")
 
@@ -19,6 +24,96 @@ def mutGaussVec(
     return (chromosome,)
 
 
+def map_batch(evaluate_batch, mapper, func, individuals, chunks: int = 1) -> list:
+    """
+    Drop-in replacement of `toolbox.map` for the evaluation step: instead
+    of calling `func` on every individual, it stacks them in a matrix and
+    evaluates one chunk per worker with the batch evaluator
+    """
+    if len(individuals) == 0:
+        return []
+
+    chromosomes = np.asarray(individuals)
+    splits = [c for c in np.array_split(chromosomes, chunks) if len(c) > 0]
+    values = np.concatenate(list(mapper(evaluate_batch, splits)))
+
+    return [tuple(v) for v in values]
+
+
+def timed(mapper, times: list[float]):
+    """
+    Wraps a `toolbox.map` so that the seconds of every call, the evaluation
+    of a generation, are appended to `times`
+    """
+
+    def map_timed(func, individuals) -> list:
+        start = time.perf_counter()
+        results = list(mapper(func, individuals))
+        times.append(time.perf_counter() - start)
+        return results
+
+    return map_timed
+
+
+class HallOfFame(tools.HallOfFame):
+    """
+    DEAP hall of fame that detects duplicates through a set of chromosome
+    hashes instead of comparing every individual with `similar`, and
+    inserts only the best new individuals picked with a bounded heap
+    """
+
+    def __init__(self, maxsize: int, tolerance: float | None = None) -> None:
+        super().__init__(maxsize, similar=np.array_equal)
+        self.tolerance = tolerance
+        self._members = set()
+        self._hashes = []
+
+    def update(self, population) -> None:
+        fresh = {}
+        chromosomes = np.asarray(population, dtype=np.float64)
+        for ind, key in zip(population, halloffame.keys(chromosomes, self.tolerance)):
+            if key not in self._members and key not in fresh:
+                fresh[key] = ind
+
+        best = heapq.nlargest(
+            self.maxsize, fresh.items(), key=lambda item: item[1].fitness
+        )
+        for key, ind in best:
+            if len(self) == self.maxsize:
+                if not ind.fitness > self[-1].fitness:
+                    break
+                self._members.discard(self._hashes.pop())
+                self.remove(-1)
+            self._hashes.insert(self._position(ind), key)
+            self.insert(ind)
+            self._members.add(key)
+
+    def _position(self, ind) -> int:
+        # `insert` keeps the items by decreasing fitness, after the ties
+        return len(self) - bisect.bisect_right(self.keys, ind.fitness)
+
+    def clear(self) -> None:
+        super().clear()
+        self._members = set()
+        self._hashes = []
+
+
+def hof_arrays(
+    hof: tools.HallOfFame, dtype=np.float64
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Exports the hall of fame as the (n, features) matrix of its individuals
+    and the vector of their weighted fitness
+    """
+    if len(hof) == 0:
+        return np.empty((0, 0), dtype), np.empty(0, dtype)
+
+    chromosomes = np.asarray(hof.items, dtype=dtype)
+    fitness = np.fromiter((ind.fitness.wvalues[0] for ind in hof), dtype, len(hof))
+
+    return chromosomes, fitness
+
+
 def create_toolbox_deap(X: np.ndarray) -> base.Toolbox:
     creator.create("FitnessMin", base.Fitness, weights=(-1.0,))
     creator.create("Individual", np.ndarray, fitness=getattr(creator, "FitnessMin"))
@@ -39,7 +134,7 @@ def create_toolbox_deap(X: np.ndarray) -> base.Toolbox:
 
 
 def update_toolbox_deap(
-    toolbox: base.Toolbox, point: np.ndarray, target: int, blackbox
+    toolbox: base.Toolbox, point: np.ndarray, target: int, blackbox, cache=None
 ):
     # update the toolbox with new generation and evaluation
     toolbox.register("features", np.copy, point)
@@ -59,35 +154,76 @@ def update_toolbox_deap(
         point=point,
         target=target,
         blackbox=blackbox,
+        cache=cache,
+    )
+
+    toolbox.register(
+        "evaluate_batch",
+        genetic.evaluate_batch,
+        point=point,
+        target=target,
+        blackbox=blackbox,
+        cache=cache,
     )
 
     return toolbox
 
 
-def run_deap(toolbox: base.Toolbox, population_size: int, workers_num: int):
+def run_deap(
+    toolbox: base.Toolbox,
+    population_size: int,
+    workers_num: int,
+    batch: bool = True,
+    criteria: list[termination.Criterion] | None = None,
+    max_generations: int = 100,
+    cxpb: float = 0.8,
+    mutpb: float = 0.2,
+    pool: multiprocessing.pool.Pool | None = None,
+) -> tuple[tools.HallOfFame, engine.Statistics]:
+    """
+    Runs `eaSimple` one generation at a time, so that the termination
+    `criteria` can stop it before `max_generations`, and records every
+    generation in the same statistics of the in-tree engine, with the time
+    of its evaluation as the engine does. A given `pool` is left open for
+    the next runs.
+    """
     # run the genetic algorithm on one point with a specific target class
-    hof = tools.HallOfFame(int(0.1 * population_size), similar=np.array_equal)
-    stats = tools.Statistics(key=lambda ind: ind.fitness.values)
-    stats.register("min", np.min)
-    stats.register("max", np.max)
-    stats.register("mean", np.mean)
-    stats.register("std", np.std)
-
-    pool = mp.Pool(workers_num)
-    toolbox.register("map", pool.map)
+    hof = HallOfFame(int(0.1 * population_size))
+    stats = engine.Statistics()
+    termination.start(criteria)
+
+    own_pool = pool is None
+    if own_pool:
+        pool = mp.Pool(workers_num)
+    mapper = pool.map
+    if batch:
+        mapper = functools.partial(
+            map_batch, getattr(toolbox, "evaluate_batch"), pool.map, chunks=workers_num
+        )
+    times = []
+    toolbox.register("map", timed(mapper, times))
 
     population = getattr(toolbox, "population")(n=population_size)
-    population, _, _ = algorithms.eaSimple(
-        population=population,
-        toolbox=toolbox,
-        cxpb=0.8,
-        mutpb=0.2,
-        ngen=100,
-        stats=stats,
-        halloffame=hof,
-    )
-
-    pool.close()
-    pool.join()
+    for _ in range(max_generations):
+        population, logbook, _ = algorithms.eaSimple(
+            population=population,
+            toolbox=toolbox,
+            cxpb=cxpb,
+            mutpb=mutpb,
+            ngen=1,
+            halloffame=hof,
+            verbose=False,
+        )
+
+        # the last map of a call evaluates its generation, the first one the
+        # invalid individuals of the initial population
+        fitness = np.asarray([ind.fitness.wvalues[0] for ind in population])
+        stats.record(fitness, np.asarray(population), logbook[-1]["nevals"], times[-1])
+        if termination.stop(criteria, stats, hof):
+            break
+
+    if own_pool:
+        pool.close()
+        pool.join()
 
     return hof, stats
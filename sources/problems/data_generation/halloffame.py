@@ -0,0 +1,175 @@
+import numpy as np
+
+from neighborhood_generator.population import Population
+from ppga import base
+
+
+def keys(chromosomes: np.ndarray, tolerance: float | None = None) -> list[bytes]:
+    """
+    Returns a hashable key for every row of the chromosomes matrix: its
+    bytes or, with a `tolerance`, the bytes of the cell of the grid of
+    that step holding it, so that near duplicates share the same key
+    """
+    if tolerance is None:
+        # -0.0 and 0.0 are the same gene
+        rows = np.ascontiguousarray(chromosomes + 0.0)
+    else:
+        rows = np.ascontiguousarray(np.floor(chromosomes / tolerance), np.int64)
+
+    if rows.size == 0:
+        return [b""] * len(rows)
+
+    return rows.view(np.dtype((np.void, rows.strides[0]))).ravel().tolist()
+
+
+class HallOfFame:
+    """
+    Hall of fame with the interface of `ppga.base.HallOfFame` that keeps
+    its best individuals, without duplicates, in preallocated arrays
+    sorted by decreasing fitness. Individual objects are only built when
+    they are accessed one by one.
+
+    Duplicates are detected through a set of chromosome hashes and the
+    best candidates through `np.argpartition`, so that an update costs
+    O(n + k log k) for a population of n individuals and a hall of fame
+    of k. With a `tolerance` the chromosomes falling in the same cell of
+    a grid of that step count as duplicates.
+    """
+
+    def __init__(
+        self, size: int, dtype=np.float64, tolerance: float | None = None
+    ) -> None:
+        assert tolerance is None or tolerance > 0
+        self.size = size
+        self.dtype = np.dtype(dtype)
+        self.tolerance = tolerance
+        self._chromosomes = None
+        self._values = None
+        self._fitness = np.empty(size, dtype=self.dtype)
+        self._keys = []
+        self._members = set()
+        self._len = 0
+
+    def update(self, population: Population | list[base.Individual]) -> None:
+        if len(population) == 0:
+            return
+
+        if isinstance(population, Population):
+            self.update_arrays(
+                population.chromosomes, population.values, population.fitness
+            )
+            return
+
+        chromosomes = np.asarray([ind.chromosome for ind in population])
+        values = np.asarray([ind.values for ind in population])
+        fitness = np.asarray([ind.fitness for ind in population])
+        self.update_arrays(chromosomes, values, fitness)
+
+    def update_arrays(
+        self, chromosomes: np.ndarray, values: np.ndarray, fitness: np.ndarray
+    ) -> None:
+        """
+        Merges a population given as arrays in the hall of fame
+        """
+        if len(fitness) == 0 or self.size == 0:
+            return
+
+        chromosomes = np.asarray(chromosomes, self.dtype).reshape(len(fitness), -1)
+        values = np.asarray(values, self.dtype).reshape(len(fitness), -1)
+        fitness = np.asarray(fitness, self.dtype)
+        if self._chromosomes is None:
+            self._chromosomes = np.empty((self.size, chromosomes.shape[1]), self.dtype)
+            self._values = np.empty((self.size, values.shape[1]), self.dtype)
+
+        # only the individuals better than the worst member can enter
+        n = self._len
+        candidates = np.arange(len(fitness))
+        if n == self.size:
+            candidates = np.flatnonzero(fitness > self._fitness[n - 1])
+
+        # drop the members and the repeated candidates
+        fresh = {}
+        for i, key in zip(candidates, keys(chromosomes[candidates], self.tolerance)):
+            if key not in self._members and key not in fresh:
+                fresh[key] = i
+        if len(fresh) == 0:
+            return
+
+        candidates = np.fromiter(fresh.values(), np.intp, len(fresh))
+        new_keys = list(fresh)
+        if len(candidates) > self.size:
+            top = np.argpartition(-fitness[candidates], self.size - 1)[: self.size]
+            candidates = candidates[top]
+            new_keys = [new_keys[i] for i in top]
+
+        # members first, so that they win the ties
+        merged_fitness = np.concatenate([self._fitness[:n], fitness[candidates]])
+        best = np.argsort(-merged_fitness, kind="stable")[: self.size]
+
+        merged_keys = self._keys + new_keys
+        self._keys = [merged_keys[i] for i in best]
+        self._members = set(self._keys)
+
+        self._len = len(best)
+        self._chromosomes[: self._len] = np.concatenate(
+            [self._chromosomes[:n], chromosomes[candidates]]
+        )[best]
+        self._values[: self._len] = np.concatenate(
+            [self._values[:n], values[candidates]]
+        )[best]
+        self._fitness[: self._len] = merged_fitness[best]
+
+    def arrays(self) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Returns views, not copies, of the (n, features) chromosomes matrix
+        and of the fitness vector
+        """
+        if self._chromosomes is None:
+            return np.empty((0, 0), self.dtype), self._fitness[:0]
+
+        return self._chromosomes[: self._len], self._fitness[: self._len]
+
+    def values(self) -> np.ndarray:
+        if self._values is None:
+            return np.empty((0, 0), self.dtype)
+
+        return self._values[: self._len]
+
+    def to_arrays(self) -> dict[str, np.ndarray]:
+        chromosomes, fitness = self.arrays()
+        return {"chromosome": chromosomes, "values": self.values(), "fitness": fitness}
+
+    def to_list(self) -> list[dict]:
+        return to_records(self.to_arrays())
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __getitem__(self, i: int) -> base.Individual:
+        if i < 0:
+            i += self._len
+        if i < 0 or i >= self._len:
+            raise IndexError("hall of fame index out of range")
+
+        return base.Individual(
+            self._chromosomes[i].copy(),
+            self._values[i].copy(),
+            float(self._fitness[i]),
+        )
+
+    def __iter__(self):
+        for i in range(self._len):
+            yield self[i]
+
+
+def to_records(neighborhood: dict[str, np.ndarray]) -> list[dict]:
+    """
+    Converts the arrays of a hall of fame in a list with a dict per
+    individual, the layout of the JSON results
+    """
+    return [
+        {"chromosome": c.tolist(), "values": v.tolist(), "fitness": float(f)}
+        for c, v, f in zip(
+            neighborhood["chromosome"], neighborhood["values"], neighborhood["fitness"]
+        )
+    ]
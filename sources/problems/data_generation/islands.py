@@ -0,0 +1,373 @@
+import multiprocessing as mp
+import random
+import socket
+import threading
+import time
+from multiprocessing.connection import Client, Connection, Listener
+
+import numpy as np
+
+from neighborhood_generator import engine, halloffame
+from neighborhood_generator import termination as stopping
+from neighborhood_generator.population import Population
+
+TOPOLOGIES = ("ring", "full", "random")
+TRANSPORTS = ("pipe", "tcp")
+
+
+def destinations(
+    topology: str, island: int, islands_num: int, rng: np.random.Generator
+) -> list[int]:
+    """
+    Returns the islands that receive the migrants of `island`
+    """
+    others = [i for i in range(islands_num) if i != island]
+    if len(others) == 0:
+        return []
+
+    if topology == "ring":
+        return [(island + 1) % islands_num]
+    if topology == "full":
+        return others
+
+    return [int(rng.choice(others))]
+
+
+def free_addresses(islands_num: int, host: str = "127.0.0.1") -> list[tuple]:
+    """
+    Returns an address with a free port on `host` for every island
+    """
+    sockets = [socket.socket() for _ in range(islands_num)]
+    for s in sockets:
+        s.bind((host, 0))
+    addresses = [s.getsockname() for s in sockets]
+    for s in sockets:
+        s.close()
+
+    return addresses
+
+
+def pipes(islands_num: int) -> list[dict[int, Connection]]:
+    """
+    Connects every couple of islands with a pipe, returns the connections
+    of every island by neighbor
+    """
+    connections = [{} for _ in range(islands_num)]
+    for i in range(islands_num):
+        for j in range(i + 1, islands_num):
+            connections[i][j], connections[j][i] = mp.Pipe()
+
+    return connections
+
+
+def connect(address: tuple, timeout: float = 30.0) -> Connection:
+    """
+    Connects to an island, waiting for it to be listening
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            return Client(address)
+        except ConnectionRefusedError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.05)
+
+
+def sockets(island: int, addresses: list[tuple]) -> dict[int, Connection]:
+    """
+    Connects the island to all the others over TCP: it connects to the
+    islands before it and accepts the connections of the ones after it
+    """
+    connections = {}
+    with Listener(tuple(addresses[island])) as listener:
+        for j in range(island):
+            conn = connect(tuple(addresses[j]))
+            conn.send(island)
+            connections[j] = conn
+
+        for _ in range(island + 1, len(addresses)):
+            conn = listener.accept()
+            connections[conn.recv()] = conn
+
+    return connections
+
+
+def send(
+    connections: dict[int, Connection], message: tuple | None, done: list[int]
+) -> None:
+    """
+    Sends `message` to the islands in order, appending to `done` the ones
+    served, also when their connection is broken
+    """
+    for island, conn in connections.items():
+        try:
+            conn.send(message)
+        except (BrokenPipeError, ConnectionError, EOFError, OSError):
+            pass
+        done.append(island)
+
+
+def receive(connections: dict[int, Connection], arrived: list[Population]) -> None:
+    """
+    Appends to `arrived` the migrants already waiting on the connections
+    and forgets the islands that finished
+    """
+    for island, conn in list(connections.items()):
+        try:
+            while conn.poll():
+                message = conn.recv()
+                if message is None:
+                    raise EOFError
+                chromosomes, values, fitness = message
+                valid = np.ones(len(fitness), dtype=bool)
+                arrived.append(Population(chromosomes, values, fitness, valid))
+        except (BrokenPipeError, ConnectionError, EOFError, OSError):
+            # the island stopped, nothing more is sent to it
+            del connections[island]
+
+
+def exchange(
+    connections: dict[int, Connection],
+    targets: list[int],
+    message: tuple | None,
+    timeout: float,
+) -> list[Population]:
+    """
+    Sends `message` to the target islands still running and returns the
+    migrants received meanwhile. A batch larger than the buffers blocks
+    until the target reads it, so the island keeps reading its own
+    migrants while the sends go on, for at most `timeout` seconds: a
+    target that does not read in time is forgotten.
+    """
+    targets = {t: connections[t] for t in targets if t in connections}
+    done = []
+    sender = threading.Thread(target=send, args=(targets, message, done), daemon=True)
+    sender.start()
+
+    arrived = []
+    deadline = time.monotonic() + timeout
+    while sender.is_alive() and time.monotonic() < deadline:
+        receive(connections, arrived)
+        sender.join(0.001)
+    receive(connections, arrived)
+
+    if sender.is_alive():
+        stuck = list(targets)[len(done)]
+        connections.pop(stuck, None)
+
+    return arrived
+
+
+def migrate(
+    population: Population,
+    connections: dict[int, Connection],
+    targets: list[int],
+    migrants: int,
+    timeout: float = 60.0,
+) -> int:
+    """
+    Sends the best `migrants` individuals to the target islands and puts
+    the ones received so far in place of the worst. Returns the number of
+    immigrants.
+    """
+    ranking = population.ranking()
+    best = population.take(ranking[:migrants])
+
+    message = (best.chromosomes, best.values, best.fitness)
+    arrived = exchange(connections, targets, message, timeout)
+
+    immigrants = Population.concatenate(arrived)
+    if len(immigrants) == 0:
+        return 0
+
+    immigrants = immigrants.take(immigrants.ranking()[: len(population)])
+    worst = ranking[len(ranking) - len(immigrants) :]
+    population.chromosomes[worst] = immigrants.chromosomes
+    population.values[worst] = immigrants.values
+    population.fitness[worst] = immigrants.fitness
+
+    return len(immigrants)
+
+
+def run_island(
+    island: int,
+    connections: dict[int, Connection] | list[tuple],
+    toolbox: engine.ToolBox,
+    population_size: int,
+    keep: float = 0.1,
+    cxpb: float = 0.8,
+    mutpb: float = 0.2,
+    max_generations: int = 50,
+    migration_interval: int = 5,
+    migrants: int = 5,
+    topology: str = "ring",
+    hall_of_fame_size: int = 0,
+    termination: list[stopping.Criterion] | None = None,
+    seed: int | None = None,
+) -> tuple[Population, engine.Statistics, halloffame.HallOfFame | None]:
+    """
+    Evolves a single island, the same as `engine.simple` with migrations
+    every `migration_interval` generations. The `connections` to the other
+    islands are either already open, by island, or the TCP addresses of
+    all the islands, so that islands can be started on different hosts.
+    """
+    assert topology in TOPOLOGIES
+    if not isinstance(connections, dict):
+        connections = sockets(island, connections)
+
+    islands_num = len(connections) + 1
+    # the islands still running, an island that stops is removed
+    running = dict(connections)
+    # forked islands would otherwise share the same random state
+    rng = np.random.default_rng(None if seed is None else seed + island)
+    np.random.seed(rng.integers(2**32))
+    random.seed(int(rng.integers(2**32)))
+
+    hof = None
+    if hall_of_fame_size > 0:
+        hof = halloffame.HallOfFame(hall_of_fame_size)
+
+    stats = engine.Statistics()
+    stopping.start(termination)
+
+    population = Population(engine.initial(toolbox, population_size))
+    engine.evaluate_invalid(toolbox, population)
+    if hof is not None:
+        hof.update(population)
+
+    elite_size = int(keep * population_size)
+    for generation in range(1, max_generations + 1):
+        population, evals, _, elapsed = engine.step(
+            toolbox, population, elite_size, cxpb, mutpb
+        )
+
+        if generation % migration_interval == 0:
+            targets = destinations(topology, island, islands_num, rng)
+            migrate(population, running, targets, migrants)
+
+        if hof is not None:
+            hof.update(population)
+        stats.record(population.fitness, population.chromosomes, evals, elapsed)
+
+        if stopping.stop(termination, stats, hof):
+            break
+
+    # tells the other islands to stop sending migrants
+    exchange(running, list(running), None, timeout=1.0)
+    for conn in connections.values():
+        conn.close()
+
+    return population, stats, hof
+
+
+def work(results: mp.Queue, foreign: list[Connection], island: int, *args) -> None:
+    # a forked island holds the pipes of all the others, closing them lets
+    # the peers see the end of the island when it closes its own
+    for conn in foreign:
+        conn.close()
+
+    # the parent raises the error of an island instead of waiting for it
+    try:
+        results.put((island, run_island(island, *args)))
+    except Exception as e:
+        results.put((island, e))
+
+
+def islands(
+    toolbox: engine.ToolBox,
+    population_size: int,
+    islands_num: int,
+    keep: float = 0.1,
+    cxpb: float = 0.8,
+    mutpb: float = 0.2,
+    max_generations: int = 50,
+    migration_interval: int = 5,
+    migrants: int = 5,
+    topology: str = "ring",
+    transport: str = "pipe",
+    hall_of_fame=None,
+    termination: list[stopping.Criterion] | None = None,
+    seed: int | None = None,
+) -> tuple[list[Population], list[engine.Statistics]]:
+    """
+    Island model: `islands_num` populations of `population_size`
+    individuals evolve in separate processes, each one with its own
+    generational loop, and every `migration_interval` generations send
+    their best `migrants` to the islands chosen by the `topology`.
+
+    The islands talk through local pipes or, with the `tcp` transport,
+    through sockets on localhost, the same used by `run_island` to run
+    islands on different hosts. The hall of fame, if any, receives the
+    halls of fame of all the islands. Returns the final population and
+    the statistics of every island.
+    """
+    assert topology in TOPOLOGIES
+    assert transport in TRANSPORTS
+
+    if transport == "pipe":
+        connections = pipes(islands_num)
+        foreign = [
+            [conn for j, c in enumerate(connections) if j != i for conn in c.values()]
+            for i in range(islands_num)
+        ]
+    else:
+        addresses = free_addresses(islands_num)
+        connections = [addresses] * islands_num
+        foreign = [[] for _ in range(islands_num)]
+
+    size = 0 if hall_of_fame is None else hall_of_fame.size
+    results = mp.Queue()
+    processes = [
+        mp.Process(
+            target=work,
+            args=(
+                results,
+                foreign[i],
+                i,
+                connections[i],
+                toolbox,
+                population_size,
+                keep,
+                cxpb,
+                mutpb,
+                max_generations,
+                migration_interval,
+                migrants,
+                topology,
+                size,
+                termination,
+                seed,
+            ),
+        )
+        for i in range(islands_num)
+    ]
+    for p in processes:
+        p.start()
+
+    # the parent does not use the pipes of the islands
+    if transport == "pipe":
+        for island in connections:
+            for conn in island.values():
+                conn.close()
+
+    outcomes = {}
+    for _ in range(islands_num):
+        island, outcome = results.get()
+        if isinstance(outcome, Exception):
+            for p in processes:
+                p.terminate()
+            raise outcome
+        outcomes[island] = outcome
+    for p in processes:
+        p.join()
+
+    populations, stats = [], []
+    for i in range(islands_num):
+        population, island_stats, hof = outcomes[i]
+        populations.append(population)
+        stats.append(island_stats)
+        if hall_of_fame is not None:
+            hall_of_fame.update_arrays(*hof.to_arrays().values())
+
+    return populations, stats
@@ -2,7 +2,9 @@ import argparse
 import json
 
 import generator
+import halloffame
 import numpy as np
+import writer
 import pandas as pd
 from sklearn.model_selection import train_test_split
 from sklearn.neural_network import MLPClassifier
@@ -20,6 +22,18 @@ if __name__ == "__main__":
         type=int,
         help="specify the number of synthetic individuals to generate",
     )
+    parser.add_argument(
+        "--output",
+        type=str,
+        default="./synthetic.json",
+        help="specify a JSON file or the directory of a Parquet dataset",
+    )
+    parser.add_argument(
+        "--warm-start",
+        type=float,
+        default=0.0,
+        help="fraction of every population seeded from nearby explained points",
+    )
     args = parser.parse_args()
 
     # logger
@@ -41,7 +55,19 @@ if __name__ == "__main__":
     logger.info(f"population size: {args.pop_size}")
 
     # generate the synthetic neighbors
-    neighbors = generator.generate(X_test, predictions, mlp, args.pop_size)
+    if args.output.endswith(".json"):
+        neighbors = generator.generate(
+            X_test, predictions, mlp, args.pop_size, warm_start=args.warm_start
+        )
+        for n in neighbors:
+            n["neighborhood"] = halloffame.to_records(n["neighborhood"])
 
-    with open("./synthetic.json", "w") as fp:
-        json.dump(neighbors, fp, indent=2)
+        with open(args.output, "w") as fp:
+            json.dump(neighbors, fp, indent=2)
+    else:
+        # stream every neighborhood to disk as soon as it is ready
+        with writer.NeighborhoodWriter(args.output) as out:
+            for result in generator.iter_generate(
+                X_test, predictions, mlp, args.pop_size, warm_start=args.warm_start
+            ):
+                out.write(result)
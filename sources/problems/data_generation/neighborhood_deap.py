@@ -1,7 +1,10 @@
+import multiprocessing as mp
+import multiprocessing.pool
+
 import numpy as np
 
 from deap import base
-from neighborhood_generator import genetic_deap
+from neighborhood_generator import genetic_deap, registry
 
 
 def single_point_deap(
@@ -11,6 +14,8 @@ def single_point_deap(
     blackbox,
     target: int,
     workers_num: int,
+    criteria: list | None = None,
+    pool: multiprocessing.pool.Pool | None = None,
 ) -> dict[str, float]:
     """
     Generates neighbors close to the given point and classified
@@ -18,18 +23,20 @@ def single_point_deap(
     """
     # update the point for the generation
     toolbox = genetic_deap.update_toolbox_deap(toolbox, point, target, blackbox)
-    hof, _ = genetic_deap.run_deap(toolbox, population_size, workers_num)
+    hof, stats = genetic_deap.run_deap(
+        toolbox, population_size, workers_num, criteria=criteria, pool=pool
+    )
 
-    synth_points, scores = list(zip(*[(ind, ind.fitness.wvalues) for ind in hof]))
-    scores = np.asarray(scores)
-    synth_outcomes = blackbox.predict(np.asarray(synth_points))
+    synth_points, scores = genetic_deap.hof_arrays(hof)
+    synth_outcomes = registry.resolve(blackbox).predict(synth_points)
 
     return {
         "min_fitness": scores.min(),
         "mean_fitness": scores.mean(),
         "fitness_std": scores.std(),
         "max_fitness": scores.max(),
-        "accuracy": len(synth_outcomes[synth_outcomes == target]) / len(synth_outcomes),
+        "accuracy": np.mean(synth_outcomes == target),
+        "stop_generation": stats.stop_generation,
     }
 
 
@@ -39,10 +46,12 @@ def generate_deap(
     y: np.ndarray,
     population_size: int,
     workers_num: int,
+    criteria: list | None = None,
 ) -> dict[str, list]:
     """
     Generates synthetic neighbors for each point of the dataset.
-    A neighborhood is generated for every possible outcome.
+    A neighborhood is generated for every possible outcome, each run
+    stops early if one of the termination `criteria` is met.
     """
     # collect all the possible outcomes
     outcomes = np.unique(y)
@@ -50,6 +59,9 @@ def generate_deap(
     # create a toolbox with fixed params
     toolbox = genetic_deap.create_toolbox_deap(X)
 
+    # the workers receive only the key of the model
+    key = registry.register(model)
+
     # dataset of results
     results = {
         "point": [],
@@ -61,19 +73,31 @@ def generate_deap(
         "fitness_std": [],
         "max_fitness": [],
         "accuracy": [],
+        "stop_generation": [],
     }
 
-    for i, (point, outcome) in enumerate(zip(X, y)):
-        for target in outcomes:
-            stats = single_point_deap(
-                toolbox, population_size, point, model, target, workers_num
-            )
+    # the same workers serve every run
+    with mp.Pool(workers_num) as pool:
+        for i, (point, outcome) in enumerate(zip(X, y)):
+            for target in outcomes:
+                stats = single_point_deap(
+                    toolbox,
+                    population_size,
+                    point,
+                    key,
+                    target,
+                    workers_num,
+                    criteria,
+                    pool,
+                )
+
+                results["point"].append(i)
+                results["class"].append(outcome)
+                results["target"].append(target)
+                results["model"].append(str(model).removesuffix("()"))
+                for k in stats:
+                    results[k].append(stats[k])
 
-            results["point"].append(i)
-            results["class"].append(outcome)
-            results["target"].append(target)
-            results["model"].append(str(model).removesuffix("()"))
-            for k in stats:
-                results[k].append(stats[k])
+    registry.unregister(key)
 
     return results
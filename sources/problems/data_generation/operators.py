@@ -0,0 +1,48 @@
+import numpy as np
+
+
+def sel_tournament(fitness: np.ndarray, n: int, tournsize: int = 3) -> np.ndarray:
+    """
+    Tournament selection over the fitness vector of the population, with
+    all the contestants drawn at once. Returns the indices of the winners.
+    """
+    contestants = np.random.randint(len(fitness), size=(n, tournsize))
+    winners = np.argmax(fitness[contestants], axis=1)
+
+    return contestants[np.arange(n), winners]
+
+
+def cx_one_point(
+    first: np.ndarray, second: np.ndarray, mask: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    One point crossover between the rows of two (n, d) matrices, applied
+    only to the rows selected by the mask. Returns two new matrices.
+    """
+    n, d = first.shape
+    cuts = np.random.randint(1, max(2, d), size=n)
+    swap = (np.arange(d)[None, :] >= cuts[:, None]) & mask[:, None]
+
+    return np.where(swap, second, first), np.where(swap, first, second)
+
+
+def mut_normal(
+    chromosomes: np.ndarray,
+    mask: np.ndarray,
+    mu: np.ndarray,
+    sigma: np.ndarray,
+    indpb: float,
+) -> np.ndarray:
+    """
+    Gaussian mutation of the rows selected by the mask: every gene is
+    replaced with probability `indpb` by a draw from N(mu, sigma) of its
+    column. Returns a new matrix.
+    """
+    genes = (np.random.random(chromosomes.shape) < indpb) & mask[:, None]
+    mu = np.broadcast_to(mu, chromosomes.shape)[genes]
+    sigma = np.broadcast_to(sigma, chromosomes.shape)[genes]
+
+    mutated = chromosomes.copy()
+    mutated[genes] = np.random.normal(mu, sigma)
+
+    return mutated
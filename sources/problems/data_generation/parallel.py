@@ -0,0 +1,438 @@
+import functools
+import hashlib
+import math
+import multiprocessing as mp
+import pickle
+import time
+from collections import deque
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+TRANSPORTS = ("queue", "shm")
+
+# objects shared with the worker by name, see `Pool.share`
+_shared: dict[str, object] = {}
+
+
+def assign(name: str, data: bytes) -> None:
+    _shared[name] = pickle.loads(data)
+
+
+def call(name: str, chunk):
+    return _shared[name](chunk)
+
+
+class Segment:
+    """
+    Shared memory block holding the chromosomes matrix of a generation,
+    followed by the matrix of their values written by the workers
+    """
+
+    def __init__(self, name: str | None = None, size: int = 0) -> None:
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=max(1, size))
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    @property
+    def size(self) -> int:
+        return self.shm.size
+
+    def views(
+        self, rows: int, features: int, width: int
+    ) -> tuple[np.ndarray, np.ndarray]:
+        chromosomes = np.ndarray((rows, features), np.float64, self.shm.buf)
+        values = np.ndarray(
+            (rows, width), np.float64, self.shm.buf, offset=chromosomes.nbytes
+        )
+
+        return chromosomes, values
+
+    def close(self) -> None:
+        self.shm.close()
+
+    def unlink(self) -> None:
+        self.shm.close()
+        self.shm.unlink()
+
+
+def work(tasks: mp.Queue, results: mp.Queue, initializer, initargs: tuple) -> None:
+    """
+    Worker loop: runs the tasks of its queue until it receives None
+    """
+    if initializer is not None:
+        initializer(*initargs)
+
+    segment = None
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+
+        kind, i, func, payload = task
+        try:
+            if kind == "map":
+                start = time.perf_counter()
+                result = func(payload)
+                results.put((i, result, time.perf_counter() - start))
+                continue
+
+            # only the descriptor of the chunk travels through the queue
+            name, rows, features, width, offset, length = payload
+            if segment is None or segment.name != name:
+                if segment is not None:
+                    segment.close()
+                segment = Segment(name)
+
+            start = time.perf_counter()
+            chromosomes, values = segment.views(rows, features, width)
+            chunk = slice(offset, offset + length)
+            values[chunk] = np.asarray(func(chromosomes[chunk])).reshape(length, -1)
+            results.put((i, None, time.perf_counter() - start))
+        except Exception as e:
+            results.put((i, e, 0.0))
+
+    if segment is not None:
+        segment.close()
+
+
+class Pool:
+    """
+    Pool of persistent workers, each one with its own task queue and a
+    results queue shared by all of them.
+
+    With the `queue` transport the chunks are pickled through the queues.
+    With the `shm` transport `scatter` places the chromosomes matrix of
+    every generation in a shared memory segment, only (offset, length)
+    descriptors travel through the queues and the workers write the
+    values back in place.
+
+    The pool can outlive many runs: `share` installs an object, such as
+    the evaluation function of a run, in every worker once and `scatter`
+    then sends only its name with every chunk. Objects are sent again
+    only when they change.
+
+    `scatter` splits the share of every worker in sub-chunks, so that the
+    worker computes a sub-chunk while the next ones are still arriving.
+    With a fixed `chunk_size` the sub-chunks have that size, otherwise it
+    is chosen at every call from the per item compute time and the per
+    byte transfer time measured on the previous calls.
+    """
+
+    def __init__(
+        self,
+        workers_num: int,
+        transport: str = "queue",
+        initializer=None,
+        initargs: tuple = (),
+        chunk_size: int | None = None,
+    ) -> None:
+        assert transport in TRANSPORTS
+        assert chunk_size is None or chunk_size > 0
+        self.workers_num = workers_num
+        self.transport = transport
+        self.fixed_chunk_size = chunk_size
+
+        # workers must share the tracker of the segments with the pool
+        if transport == "shm":
+            resource_tracker.ensure_running()
+
+        self._tasks = [mp.Queue() for _ in range(workers_num)]
+        self._results = mp.Queue()
+        self._workers = [
+            mp.Process(
+                target=work,
+                args=(q, self._results, initializer, initargs),
+                daemon=True,
+            )
+            for q in self._tasks
+        ]
+        for w in self._workers:
+            w.start()
+
+        self._segment = None
+        # number of values returned by every function, by shared name
+        self._widths = {}
+
+        self._objects = {}
+        self._digests = {}
+
+        # every result is tagged with the call that sent its task, so that
+        # the results left behind by a failed call are dropped
+        self._calls = 0
+
+        # times of the last scatter: sending, waiting and compute by worker
+        self.timing = {"dispatch": 0.0, "wait": 0.0, "computes": np.zeros(workers_num)}
+
+        # online cost model of the sub-chunks
+        self.chunk_size = 0
+        self.latency = self._ping()
+        self.item_cost = None
+        self.call_cost = 0.0
+        self.byte_cost = 0.0
+        self._samples = deque(maxlen=256)
+
+    def _begin(self) -> int:
+        self._calls += 1
+        return self._calls
+
+    def _collect(self, n: int) -> tuple[list, list[float]]:
+        """
+        Waits for the `n` results of the current call, all of them even if
+        a task failed, and raises the first error
+        """
+        results = [None] * n
+        computes = [0.0] * n
+        error = None
+        received = 0
+        while received < n:
+            (call, i), result, compute = self._results.get()
+            if call != self._calls:
+                continue
+            received += 1
+            if isinstance(result, Exception):
+                error = error or result
+                continue
+            results[i] = result
+            computes[i] = compute
+
+        if error is not None:
+            raise error
+
+        return results, computes
+
+    def _ping(self, repeats: int = 3) -> float:
+        """
+        Returns the latency of a message to a worker and back
+        """
+        self.map(len, [b""] * self.workers_num)
+        start = time.perf_counter()
+        for _ in range(repeats):
+            self.map(len, [b""] * self.workers_num)
+
+        return (time.perf_counter() - start) / repeats
+
+    def map(self, func, iterable) -> list:
+        """
+        Applies `func` to every item, sent round robin to the workers, and
+        returns the results in order
+        """
+        func = self._resolve(func)
+        items = list(iterable)
+        call = self._begin()
+        for i, item in enumerate(items):
+            self._tasks[i % self.workers_num].put(("map", (call, i), func, item))
+
+        return self._collect(len(items))[0]
+
+    def submit(self, worker: int, task: int, func, chunk: np.ndarray) -> None:
+        """
+        Sends `chunk` to the given worker without waiting for the result,
+        that `receive` returns tagged with `task`
+        """
+        tag = (self._calls, task)
+        self._tasks[worker].put(("map", tag, self._resolve(func), chunk))
+
+    def receive(self) -> tuple[int, object]:
+        """
+        Waits for the first result of a submitted task. After an error the
+        results of the tasks still running are dropped.
+        """
+        while True:
+            (call, task), result, _ = self._results.get()
+            if call == self._calls:
+                break
+        if isinstance(result, Exception):
+            self._begin()
+            raise result
+
+        return task, result
+
+    def share(self, name: str, obj) -> bool:
+        """
+        Installs `obj` in every worker under `name`, unless the workers
+        already have an equal copy. Returns whether it was sent.
+        """
+        data = pickle.dumps(obj)
+        digest = hashlib.sha1(data).digest()
+        self._objects[name] = obj
+        if self._digests.get(name) == digest:
+            return False
+
+        self._digests[name] = digest
+        self._widths.pop(name, None)
+        call = self._begin()
+        for w, q in enumerate(self._tasks):
+            q.put(("map", (call, w), functools.partial(assign, name), data))
+        self._collect(self.workers_num)
+
+        return True
+
+    def _name(self, func) -> str | None:
+        for name, obj in self._objects.items():
+            if callable(obj) and func == obj:
+                return name
+
+        return None
+
+    def _resolve(self, func):
+        # shared functions travel by name
+        name = self._name(func)
+        if name is not None:
+            return functools.partial(call, name)
+
+        return func
+
+    def _sub_chunk(self, share: int, item_bytes: int) -> int:
+        """
+        Sub-chunk size that minimizes the time of a worker share: every
+        sub-chunk pays the latency and the fixed cost of a call, the first
+        one is not overlapped
+        """
+        if self.fixed_chunk_size is not None:
+            return min(share, self.fixed_chunk_size)
+
+        if self.item_cost is None:
+            return share
+
+        cost = self.item_cost + self.byte_cost * item_bytes
+        if cost <= 0.0:
+            return share
+
+        fixed = self.latency + self.call_cost
+
+        return max(1, min(share, round(math.sqrt(share * fixed / cost))))
+
+    def _measure(
+        self,
+        elapsed: float,
+        computes: list[float],
+        owners: list[int],
+        lengths: list[int],
+        share_bytes: int,
+        messages: int,
+        alpha: float = 0.5,
+    ) -> None:
+        """
+        Updates the per item compute and per byte transfer costs with the
+        times of the last call
+        """
+        worker_computes = np.bincount(owners, computes, self.workers_num)
+
+        # compute time of a sub-chunk as a fixed cost plus a cost per item
+        self._samples.extend(zip(lengths, computes))
+        x, y = np.asarray(self._samples).T
+        call_cost, item_cost = 0.0, y.sum() / x.sum()
+        if x.std() > 0:
+            slope, intercept = np.polyfit(x, y, 1)
+            if slope > 0 and intercept > 0:
+                call_cost, item_cost = intercept, slope
+        self.call_cost = call_cost
+
+        overhead = elapsed - worker_computes.max() - messages * self.latency
+        byte_cost = max(0.0, overhead) / max(1, share_bytes)
+
+        if self.item_cost is None:
+            self.item_cost, self.byte_cost = item_cost, byte_cost
+        else:
+            self.item_cost = alpha * item_cost + (1 - alpha) * self.item_cost
+            self.byte_cost = alpha * byte_cost + (1 - alpha) * self.byte_cost
+
+    def scatter(self, func, chromosomes: np.ndarray) -> np.ndarray:
+        """
+        Applies `func` to the chromosomes matrix, split in sub-chunks of
+        the share of every worker, and returns the joined values matrix.
+        With the `shm` transport the number of values of every function is
+        learned on its first call, that goes through the queues.
+        """
+        key = self._name(func) or func
+        func = self._resolve(func)
+        width = self._widths.get(key)
+        chromosomes = np.asarray(chromosomes, dtype=np.float64)
+        rows, features = chromosomes.shape
+        if rows == 0:
+            return np.empty((0, width or 1))
+
+        item_bytes = features * chromosomes.itemsize
+        share = math.ceil(rows / self.workers_num)
+        self.chunk_size = self._sub_chunk(share, item_bytes)
+
+        # sub-chunks of every worker share, sent one per worker at a time
+        chunks = []
+        for w in range(self.workers_num):
+            end = min(rows, (w + 1) * share)
+            for offset in range(w * share, end, self.chunk_size):
+                chunks.append((w, offset, min(self.chunk_size, end - offset)))
+        chunks.sort(key=lambda c: (c[1] - c[0] * share, c[0]))
+
+        shm = self.transport == "shm" and width is not None
+        if shm:
+            size = rows * (features + width) * chromosomes.itemsize
+            if self._segment is None or self._segment.size < size:
+                if self._segment is not None:
+                    self._segment.unlink()
+                self._segment = Segment(size=size)
+            shared, values = self._segment.views(rows, features, width)
+
+        call = self._begin()
+        start = time.perf_counter()
+        if shm:
+            shared[:] = chromosomes
+        for i, (w, offset, length) in enumerate(chunks):
+            if shm:
+                payload = (self._segment.name, rows, features, width)
+                payload += (offset, length)
+                self._tasks[w].put(("shm", (call, i), func, payload))
+            else:
+                chunk = chromosomes[offset : offset + length]
+                self._tasks[w].put(("map", (call, i), func, chunk))
+        dispatch = time.perf_counter() - start
+        results, computes = self._collect(len(chunks))
+        elapsed = time.perf_counter() - start
+
+        owners = [w for w, _, _ in chunks]
+        self.timing = {
+            "dispatch": dispatch,
+            "wait": elapsed - dispatch,
+            "computes": np.bincount(owners, computes, self.workers_num),
+        }
+        messages = math.ceil(share / self.chunk_size)
+        lengths = [length for _, _, length in chunks]
+        self._measure(elapsed, computes, owners, lengths, share * item_bytes, messages)
+
+        if shm:
+            return values.copy()
+
+        order = np.argsort([offset for _, offset, _ in chunks], kind="stable")
+        values = np.concatenate([results[i] for i in order])
+        self._widths[key] = values.shape[1] if values.ndim == 2 else 1
+
+        return values
+
+    def close(self) -> None:
+        for q in self._tasks:
+            q.put(None)
+
+    def join(self) -> None:
+        for w in self._workers:
+            w.join()
+        if self._segment is not None:
+            self._segment.unlink()
+            self._segment = None
+
+    def terminate(self) -> None:
+        for w in self._workers:
+            w.terminate()
+        self.join()
+
+    def __enter__(self) -> "Pool":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+        self.join()
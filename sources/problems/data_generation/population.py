@@ -0,0 +1,124 @@
+import numpy as np
+
+from ppga import base
+
+
+def matrix(rows, n: int) -> np.ndarray:
+    """
+    Returns the rows as a 2-D float matrix, also when there are none
+    """
+    rows = np.asarray(rows, dtype=float)
+    if n == 0:
+        return rows.reshape(0, rows.shape[1] if rows.ndim == 2 else 0)
+
+    return rows.reshape(n, -1)
+
+
+class Population:
+    """
+    Structure of arrays population: a contiguous (n, features) chromosomes
+    matrix, the (n, values) values matrix, the fitness vector and the
+    validity flags telling which rows hold an up to date evaluation.
+
+    Selection and replacement work on index arrays, per individual objects
+    are only built when they are accessed one by one.
+    """
+
+    def __init__(
+        self,
+        chromosomes: np.ndarray,
+        values: np.ndarray | None = None,
+        fitness: np.ndarray | None = None,
+        valid: np.ndarray | None = None,
+    ) -> None:
+        n = len(chromosomes)
+        self.chromosomes = matrix(chromosomes, n)
+
+        if values is None:
+            values = np.zeros((n, 1))
+        if fitness is None:
+            fitness = np.full(n, -np.inf)
+        if valid is None:
+            valid = np.zeros(n, dtype=bool)
+
+        self.values = matrix(values, n)
+        self.fitness = np.asarray(fitness, dtype=float)
+        self.valid = np.asarray(valid, dtype=bool)
+
+    @classmethod
+    def from_individuals(cls, individuals: list[base.Individual]) -> "Population":
+        if len(individuals) == 0:
+            return cls(np.empty((0, 0)), valid=np.ones(0, dtype=bool))
+
+        return cls(
+            np.asarray([ind.chromosome for ind in individuals]),
+            np.asarray([ind.values for ind in individuals]),
+            np.asarray([ind.fitness for ind in individuals]),
+            np.ones(len(individuals), dtype=bool),
+        )
+
+    @classmethod
+    def concatenate(cls, populations: list["Population"]) -> "Population":
+        populations = [p for p in populations if len(p) > 0]
+        if len(populations) == 0:
+            return cls(np.empty((0, 0)))
+
+        return cls(
+            np.concatenate([p.chromosomes for p in populations]),
+            np.concatenate([p.values for p in populations]),
+            np.concatenate([p.fitness for p in populations]),
+            np.concatenate([p.valid for p in populations]),
+        )
+
+    def take(self, indices: np.ndarray) -> "Population":
+        """
+        Returns the population made of the rows at the given indices
+        """
+        return Population(
+            self.chromosomes[indices],
+            self.values[indices],
+            self.fitness[indices],
+            self.valid[indices],
+        )
+
+    def ranking(self) -> np.ndarray:
+        """
+        Returns the indices of the individuals by decreasing fitness
+        """
+        return np.argsort(-self.fitness, kind="stable")
+
+    def invalid(self) -> np.ndarray:
+        return np.flatnonzero(~self.valid)
+
+    def assign(
+        self, indices: np.ndarray, values: np.ndarray, fitness: np.ndarray
+    ) -> None:
+        """
+        Stores the evaluation of the rows at the given indices
+        """
+        # the number of values is known only after the first evaluation
+        if self.values.shape[1] != values.shape[1]:
+            assert not self.valid.any()
+            self.values = np.zeros((len(self), values.shape[1]))
+
+        self.values[indices] = values
+        self.fitness[indices] = fitness
+        self.valid[indices] = True
+
+    def individuals(self, indices: np.ndarray | None = None) -> list[base.Individual]:
+        if indices is None:
+            indices = range(len(self))
+
+        return [self[i] for i in indices]
+
+    def __len__(self) -> int:
+        return len(self.fitness)
+
+    def __getitem__(self, i: int) -> base.Individual:
+        return base.Individual(
+            self.chromosomes[i].copy(), self.values[i].copy(), float(self.fitness[i])
+        )
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
@@ -0,0 +1,108 @@
+import contextlib
+import time
+
+import numpy as np
+import pandas as pd
+
+PHASES = (
+    "selection",
+    "mating",
+    "dispatch",
+    "transfer",
+    "compute",
+    "collection",
+    "replacement",
+    "hall_of_fame",
+)
+
+
+class Phase:
+    """
+    Context manager adding its wall clock time to a phase of the profile
+    """
+
+    __slots__ = ("profile", "name", "start")
+
+    def __init__(self, profile: "Profile", name: str) -> None:
+        self.profile = profile
+        self.name = name
+
+    def __enter__(self) -> None:
+        self.start = time.perf_counter()
+
+    def __exit__(self, *args) -> None:
+        self.profile.add(self.name, time.perf_counter() - self.start)
+
+
+class Profile:
+    """
+    Wall clock time of every phase of every generation and compute and
+    idle time of every worker.
+
+    With a pool of workers, `dispatch` is the time spent sending the
+    chunks, `compute` the one of the slowest worker, `transfer` the rest
+    of the wait for the results, the pickling and the queues, and
+    `collection` the time to join the results once they arrived.
+    """
+
+    def __init__(self) -> None:
+        self.generations: list[dict[str, float]] = []
+        self.workers: list[np.ndarray] = []
+        self._phases = dict.fromkeys(PHASES, 0.0)
+        self._workers = None
+
+    def phase(self, name: str) -> Phase:
+        return Phase(self, name)
+
+    def add(self, name: str, seconds: float) -> None:
+        self._phases[name] += seconds
+
+    def add_workers(self, computes: np.ndarray, elapsed: float) -> None:
+        """
+        Adds the compute time of every worker during a call that lasted
+        `elapsed` seconds, the rest is idle time
+        """
+        busy = np.column_stack([computes, elapsed - np.asarray(computes)])
+        self._workers = busy if self._workers is None else self._workers + busy
+
+    def next_generation(self) -> None:
+        self.generations.append(self._phases)
+        self.workers.append(self._workers)
+        self._phases = dict.fromkeys(PHASES, 0.0)
+        self._workers = None
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Returns a row per generation and phase with its seconds
+        """
+        rows = [
+            {"generation": g, "phase": name, "seconds": seconds}
+            for g, phases in enumerate(self.generations, 1)
+            for name, seconds in phases.items()
+        ]
+
+        return pd.DataFrame(rows, columns=["generation", "phase", "seconds"])
+
+    def workers_frame(self) -> pd.DataFrame:
+        """
+        Returns a row per generation and worker with its compute and idle
+        seconds
+        """
+        rows = [
+            {"generation": g, "worker": w, "compute": compute, "idle": idle}
+            for g, workers in enumerate(self.workers, 1)
+            if workers is not None
+            for w, (compute, idle) in enumerate(workers)
+        ]
+
+        return pd.DataFrame(rows, columns=["generation", "worker", "compute", "idle"])
+
+
+def phase(profile: Profile | None, name: str):
+    """
+    Times a phase when profiling, otherwise does nothing
+    """
+    if profile is None:
+        return contextlib.nullcontext()
+
+    return profile.phase(name)
@@ -0,0 +1,47 @@
+import os
+import tempfile
+import uuid
+
+import joblib
+
+# models already available to this process, by key
+_loaded: dict[str, object] = {}
+
+
+def register(model, directory: str | None = None) -> str:
+    """
+    Dumps the model to a joblib file and returns its key, the path of the
+    file. The key is all an evaluation needs to carry to the workers.
+    """
+    if directory is None:
+        directory = tempfile.gettempdir()
+
+    name = f"{type(model).__name__}_{uuid.uuid4().hex}.joblib"
+    key = os.path.join(directory, name)
+    joblib.dump(model, key)
+    _loaded[key] = model
+
+    return key
+
+
+def resolve(blackbox):
+    """
+    Returns the model registered with the given key, loading it memory
+    mapped the first time the process asks for it. Anything that is not
+    a key is returned as it is.
+    """
+    if not isinstance(blackbox, str):
+        return blackbox
+
+    model = _loaded.get(blackbox)
+    if model is None:
+        model = joblib.load(blackbox, mmap_mode="r")
+        _loaded[blackbox] = model
+
+    return model
+
+
+def unregister(key: str) -> None:
+    _loaded.pop(key, None)
+    if os.path.exists(key):
+        os.remove(key)
@@ -0,0 +1,128 @@
+import math
+import multiprocessing as mp
+import os
+import time
+
+import numpy as np
+
+
+def measure_eval_cost(evaluate, sample: np.ndarray, repeats: int = 3) -> float:
+    """
+    Returns the time needed to evaluate a single chromosome when the
+    whole `sample` is evaluated in one batch
+    """
+    evaluate(sample[:1])
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        evaluate(sample)
+    elapsed = time.perf_counter() - start
+
+    return elapsed / (repeats * len(sample))
+
+
+def measure_ipc(sample: np.ndarray, repeats: int = 3) -> tuple[float, float]:
+    """
+    Returns the latency of a chunk round trip through a pool of workers
+    and the cost of every byte sent
+    """
+    small = [sample[:1], sample[:1]]
+    large = np.array_split(sample, 2)
+    with mp.Pool(2) as pool:
+        pool.map(len, small)
+
+        start = time.perf_counter()
+        for _ in range(repeats):
+            pool.map(len, small)
+        latency = (time.perf_counter() - start) / repeats
+
+        start = time.perf_counter()
+        for _ in range(repeats):
+            pool.map(len, large)
+        transfer = (time.perf_counter() - start) / repeats
+
+    return latency / 2, max(0.0, transfer - latency) / sample.nbytes
+
+
+def plan(
+    tasks: int,
+    workers_num: int,
+    population_size: int,
+    features: int,
+    eval_cost: float,
+    latency: float,
+    byte_cost: float,
+) -> tuple[int, int]:
+    """
+    Splits the workers between outer parallelism, running independent
+    genetic runs at the same time, and inner parallelism, sharing the
+    evaluation of every generation. Returns the number of concurrent runs
+    and the number of workers of each run that minimize the estimated
+    time of a generation over all the tasks.
+    """
+    compute = population_size * eval_cost
+    transfer = population_size * features * np.dtype(float).itemsize * byte_cost
+
+    best, best_time = (1, 1), math.inf
+    for inner in range(1, max(1, workers_num) + 1):
+        outer = max(1, min(tasks, workers_num // inner))
+        generation = compute / inner
+        if inner > 1:
+            generation += inner * latency + transfer
+
+        total = math.ceil(tasks / outer) * generation
+        if total < best_time:
+            best, best_time = (outer, inner), total
+
+    return best
+
+
+def calibrate(
+    chromosomes: np.ndarray, eval_cost: float, max_workers: int | None = None
+) -> dict[str, float]:
+    """
+    Chooses the workers of a run from the time `eval_cost` of a single
+    evaluation, measured on its first generation, and the IPC costs
+    measured on its `chromosomes`. A generation with `w` workers is
+    estimated to take its serial compute time divided by `w`, plus a
+    message latency per worker and the transfer of the chromosomes. The
+    sub-chunk size balances the latency of every sub-chunk against its
+    compute and transfer time, as `parallel.Pool` does online.
+
+    Returns the workers, the sub-chunk size, the predicted speedup over a
+    single process and the measured costs.
+    """
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    size = len(chromosomes)
+    serial = size * eval_cost
+    decision = {
+        "workers": 1,
+        "chunk_size": size,
+        "speedup": 1.0,
+        "eval_cost": eval_cost,
+        "latency": 0.0,
+        "byte_cost": 0.0,
+    }
+    max_workers = min(max_workers, size)
+    if max_workers <= 1 or serial <= 0.0:
+        return decision
+
+    latency, byte_cost = measure_ipc(chromosomes)
+    transfer = chromosomes.nbytes * byte_cost
+    best, best_time = 1, serial
+    for workers in range(2, max_workers + 1):
+        generation = serial / workers + workers * latency + transfer
+        if generation < best_time:
+            best, best_time = workers, generation
+
+    decision.update(latency=latency, byte_cost=byte_cost)
+    if best == 1:
+        return decision
+
+    share = math.ceil(size / best)
+    item_cost = eval_cost + byte_cost * chromosomes.nbytes / size
+    chunk_size = max(1, min(share, round(math.sqrt(share * latency / item_cost))))
+    decision.update(workers=best, chunk_size=chunk_size, speedup=serial / best_time)
+
+    return decision
@@ -0,0 +1,141 @@
+import math
+
+import numpy as np
+from scipy.spatial import cKDTree
+from scipy.stats import spearmanr
+
+from neighborhood_generator.population import Population
+
+MODELS = ("knn", "linear")
+
+
+class Surrogate:
+    """
+    Cheap model of the fitness trained online on the chromosomes already
+    evaluated, used to pre-screen the offspring: only the `fraction` with
+    the best predicted fitness, plus a random `exploration` share of the
+    others, goes to the real evaluation.
+
+    The model is either the mean fitness of the `neighbors` nearest
+    evaluated chromosomes or a least squares linear model, both fitted on
+    the last `capacity` evaluations. The -inf fitness of the chromosomes
+    of the wrong class is learned as a value below the worst finite one.
+
+    After every screening `skipped` holds the share of offspring not
+    evaluated and, after the evaluation, `accuracy` the Spearman rank
+    correlation between predicted and true fitness of the evaluated ones.
+    """
+
+    def __init__(
+        self,
+        model: str = "knn",
+        fraction: float = 0.5,
+        exploration: float = 0.1,
+        neighbors: int = 5,
+        capacity: int = 10000,
+        min_samples: int = 50,
+    ) -> None:
+        assert model in MODELS
+        assert 0.0 < fraction <= 1.0
+        assert 0.0 <= exploration <= 1.0
+        self.model = model
+        self.fraction = fraction
+        self.exploration = exploration
+        self.neighbors = neighbors
+        self.capacity = capacity
+        self.min_samples = min_samples
+
+        self.accuracy = np.nan
+        self.skipped = 0.0
+        self._chromosomes = None
+        self._fitness = np.empty(0)
+        self._fitted = None
+        self._predicted = None
+
+    def __len__(self) -> int:
+        return len(self._fitness)
+
+    def learn(self, chromosomes: np.ndarray, fitness: np.ndarray) -> None:
+        """
+        Adds evaluated chromosomes to the training set. If they are the
+        ones chosen by the last screening, it also measures the accuracy
+        of its predictions.
+        """
+        fitness = np.asarray(fitness, dtype=float)
+        if self._predicted is not None and len(self._predicted) == len(fitness):
+            if len(fitness) > 1:
+                self.accuracy = float(spearmanr(self._predicted, fitness)[0])
+        self._predicted = None
+
+        if len(fitness) == 0:
+            return
+
+        chromosomes = np.asarray(chromosomes, dtype=float).reshape(len(fitness), -1)
+        if self._chromosomes is None:
+            self._chromosomes = chromosomes[-self.capacity :]
+            self._fitness = fitness[-self.capacity :]
+        else:
+            self._chromosomes = np.concatenate([self._chromosomes, chromosomes])
+            self._chromosomes = self._chromosomes[-self.capacity :]
+            self._fitness = np.concatenate([self._fitness, fitness])
+            self._fitness = self._fitness[-self.capacity :]
+        self._fitted = None
+
+    def _targets(self) -> np.ndarray:
+        finite = np.isfinite(self._fitness)
+        if not finite.any():
+            return np.zeros(len(self._fitness))
+
+        low, high = self._fitness[finite].min(), self._fitness[finite].max()
+        floor = low - max(high - low, 1.0)
+
+        return np.where(finite, self._fitness, floor)
+
+    def predict(self, chromosomes: np.ndarray) -> np.ndarray:
+        """
+        Returns the predicted fitness of the chromosomes matrix
+        """
+        if self._fitted is None:
+            targets = self._targets()
+            if self.model == "knn":
+                self._fitted = (cKDTree(self._chromosomes), targets)
+            else:
+                design = np.column_stack(
+                    [self._chromosomes, np.ones(len(self._chromosomes))]
+                )
+                self._fitted = np.linalg.lstsq(design, targets, rcond=None)[0]
+
+        if self.model == "knn":
+            tree, targets = self._fitted
+            k = min(self.neighbors, len(targets))
+            _, neighbors = tree.query(chromosomes, k)
+            return targets[np.reshape(neighbors, (len(chromosomes), k))].mean(axis=1)
+
+        return chromosomes @ self._fitted[:-1] + self._fitted[-1]
+
+    def screen(self, population: Population) -> Population:
+        """
+        Returns the population without the invalid individuals that are
+        not worth a true evaluation. The invalid rows of the result are
+        the ones whose prediction is checked by the next `learn`.
+        """
+        invalid = population.invalid()
+        self.skipped = 0.0
+        self._predicted = None
+        if len(invalid) == 0 or len(self) < self.min_samples:
+            return population
+
+        predicted = self.predict(population.chromosomes[invalid])
+        order = np.argsort(-predicted, kind="stable")
+        best = math.ceil(self.fraction * len(invalid))
+        rest = order[best:]
+        explore = np.random.permutation(rest)[: round(self.exploration * len(rest))]
+        chosen = np.sort(np.concatenate([order[:best], explore]))
+
+        keep = np.sort(
+            np.concatenate([np.flatnonzero(population.valid), invalid[chosen]])
+        )
+        self.skipped = 1.0 - len(chosen) / len(invalid)
+        self._predicted = predicted[chosen]
+
+        return population.take(keep)
@@ -0,0 +1,134 @@
+import time
+
+import numpy as np
+
+
+def hof_fitness(hall_of_fame) -> tuple[np.ndarray, int]:
+    """
+    Returns the fitness vector of a hall of fame and its capacity, for both
+    the in-tree and the DEAP halls of fame
+    """
+    if hasattr(hall_of_fame, "arrays"):
+        return hall_of_fame.arrays()[1], hall_of_fame.size
+
+    fitness = [ind.fitness.wvalues[0] for ind in hall_of_fame]
+    return np.asarray(fitness, dtype=float), hall_of_fame.maxsize
+
+
+class Criterion:
+    """
+    Termination criterion checked at the end of every generation with the
+    statistics recorded so far and the hall of fame of the run
+    """
+
+    def start(self) -> None:
+        pass
+
+    def __call__(self, stats, hall_of_fame) -> bool:
+        raise NotImplementedError
+
+
+class Plateau(Criterion):
+    """
+    Stops when the best fitness has not improved by more than `tolerance`
+    in the last `generations` generations
+    """
+
+    def __init__(self, generations: int, tolerance: float = 0.0) -> None:
+        assert generations > 0
+        self.generations = generations
+        self.tolerance = tolerance
+
+    def __call__(self, stats, hall_of_fame) -> bool:
+        if len(stats.max) <= self.generations:
+            return False
+
+        before = max(stats.max[: -self.generations])
+        recent = max(stats.max[-self.generations :])
+        if not np.isfinite(recent):
+            return False
+
+        return recent - before <= self.tolerance
+
+
+class TargetFraction(Criterion):
+    """
+    Stops when at least `fraction` of the hall of fame capacity is filled
+    with individuals classified as the target, the ones with finite fitness
+    """
+
+    def __init__(self, fraction: float) -> None:
+        assert 0.0 < fraction <= 1.0
+        self.fraction = fraction
+
+    def __call__(self, stats, hall_of_fame) -> bool:
+        if hall_of_fame is None:
+            return False
+
+        fitness, capacity = hof_fitness(hall_of_fame)
+
+        return np.isfinite(fitness).sum() >= self.fraction * capacity
+
+
+class TimeBudget(Criterion):
+    """
+    Stops when the run lasted more than `seconds`
+    """
+
+    def __init__(self, seconds: float) -> None:
+        self.seconds = seconds
+        self._start = time.perf_counter()
+
+    def start(self) -> None:
+        self._start = time.perf_counter()
+
+    def __call__(self, stats, hall_of_fame) -> bool:
+        return time.perf_counter() - self._start >= self.seconds
+
+
+class EvaluationBudget(Criterion):
+    """
+    Stops when the offspring evaluations reach `evals`
+    """
+
+    def __init__(self, evals: int) -> None:
+        self.evals = evals
+
+    def __call__(self, stats, hall_of_fame) -> bool:
+        return sum(stats.evals) >= self.evals
+
+
+def from_options(
+    patience: int | None = None,
+    tolerance: float = 0.0,
+    fraction: float | None = None,
+    seconds: float | None = None,
+    evals: int | None = None,
+) -> list[Criterion]:
+    """
+    Builds the criteria corresponding to the given options, the ones left
+    to None are not used
+    """
+    criteria = []
+    if patience is not None:
+        criteria.append(Plateau(patience, tolerance))
+    if fraction is not None:
+        criteria.append(TargetFraction(fraction))
+    if seconds is not None:
+        criteria.append(TimeBudget(seconds))
+    if evals is not None:
+        criteria.append(EvaluationBudget(evals))
+
+    return criteria
+
+
+def start(criteria: list[Criterion] | None) -> None:
+    for criterion in criteria or []:
+        criterion.start()
+
+
+def stop(criteria: list[Criterion] | None, stats, hall_of_fame) -> bool:
+    """
+    Returns True if any of the criteria is met
+    """
+    return any(criterion(stats, hall_of_fame) for criterion in criteria or [])
@@ -0,0 +1,81 @@
+import numpy as np
+from scipy.spatial import cKDTree
+
+
+class WarmStartStore:
+    """
+    Index of the hall of fame members already computed, keyed by point and
+    target. The members are stored as offsets from their point, so that
+    the neighborhood of an explained point can be translated on a new
+    nearby point and used to seed its initial population.
+
+    Every target has its own KD-tree over the explained points, rebuilt
+    lazily after new points are added.
+    """
+
+    def __init__(self, members: int = 64, max_distance: float = np.inf) -> None:
+        self.members = members
+        self.max_distance = max_distance
+        self._points: dict[int, list[np.ndarray]] = {}
+        self._offsets: dict[int, list[np.ndarray]] = {}
+        self._trees: dict[int, cKDTree | None] = {}
+
+    def add(
+        self,
+        point: np.ndarray,
+        target: int,
+        chromosomes: np.ndarray,
+        fitness: np.ndarray,
+    ) -> None:
+        """
+        Stores the best `members` of a hall of fame classified as the
+        target, the ones with finite fitness
+        """
+        point = np.asarray(point, dtype=float)
+        chromosomes = np.asarray(chromosomes, dtype=float).reshape(len(fitness), -1)
+        best = np.flatnonzero(np.isfinite(fitness))
+        best = best[np.argsort(-np.asarray(fitness)[best], kind="stable")]
+        if len(best) == 0:
+            return
+
+        target = int(target)
+        self._points.setdefault(target, []).append(point)
+        self._offsets.setdefault(target, []).append(
+            chromosomes[best[: self.members]] - point
+        )
+        self._trees[target] = None
+
+    def nearest(self, point: np.ndarray, target: int) -> int | None:
+        """
+        Returns the index of the nearest explained point for the target,
+        None if there is none closer than `max_distance`
+        """
+        target = int(target)
+        if target not in self._points:
+            return None
+
+        if self._trees[target] is None:
+            self._trees[target] = cKDTree(np.asarray(self._points[target]))
+
+        distance, i = self._trees[target].query(point)
+        if distance > self.max_distance:
+            return None
+
+        return int(i)
+
+    def seeds(self, point: np.ndarray, target: int, n: int) -> np.ndarray:
+        """
+        Returns up to `n` chromosomes for the given point, the neighbors of
+        the nearest explained point translated on it
+        """
+        point = np.asarray(point, dtype=float)
+        i = self.nearest(point, target) if n > 0 else None
+        if i is None:
+            return np.empty((0, len(point)))
+
+        offsets = self._offsets[int(target)][i][:n]
+
+        return point + offsets
+
+    def __len__(self) -> int:
+        return sum(len(points) for points in self._points.values())
@@ -0,0 +1,172 @@
+import hashlib
+import io
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+
+def fixed_width(matrix: np.ndarray, dtype=np.float64) -> pa.FixedSizeListArray:
+    """
+    Stores every row of the matrix as a fixed width list of floats
+    """
+    matrix = np.asarray(matrix, dtype=dtype)
+    width = matrix.shape[1] if matrix.ndim == 2 else 0
+
+    return pa.FixedSizeListArray.from_arrays(pa.array(matrix.ravel()), width)
+
+
+class NeighborhoodWriter:
+    """
+    Appends the results of the neighborhood generation to a Parquet
+    dataset made of two tables: `runs`, with a row per (point, target)
+    and its statistics, and `neighbors`, with a row per synthetic
+    neighbor linked to its run.
+
+    Results are buffered and every `buffer_size` of them a new part file
+    is written and closed, so memory stays constant and a crash only
+    loses the results still in the buffer.
+    """
+
+    def __init__(self, path: str, buffer_size: int = 64) -> None:
+        self.path = path
+        self.buffer_size = buffer_size
+        self._runs = []
+        self._neighbors = []
+
+        os.makedirs(os.path.join(path, "runs"), exist_ok=True)
+        os.makedirs(os.path.join(path, "neighbors"), exist_ok=True)
+
+        # keep numbering runs and parts after the ones already written
+        parts = sorted(os.listdir(os.path.join(path, "runs")))
+        self._part = len(parts)
+        self._run = sum(
+            pq.read_metadata(os.path.join(path, "runs", p)).num_rows for p in parts
+        )
+
+    def write(self, result: dict) -> None:
+        neighborhood = result["neighborhood"]
+        fitness = np.asarray(neighborhood["fitness"], dtype=float)
+        chromosomes = np.asarray(neighborhood["chromosome"]).reshape(len(fitness), -1)
+        values = np.asarray(neighborhood["values"]).reshape(len(fitness), -1)
+
+        run = {
+            "run": pa.array([self._run], pa.int64()),
+            "point": fixed_width([result["point"]]),
+            "class": pa.array([result["class"]], pa.int64()),
+            "target": pa.array([result["target"]], pa.int64()),
+            "model": pa.array([result["model"]], pa.string()),
+        }
+        for k, v in result["stats"].items():
+            run[k] = pa.array([v])
+        self._runs.append(pa.table(run))
+
+        self._neighbors.append(
+            pa.table(
+                {
+                    "run": pa.array(np.full(len(fitness), self._run), pa.int64()),
+                    "rank": pa.array(np.arange(len(fitness)), pa.int32()),
+                    "chromosome": fixed_width(chromosomes),
+                    "values": fixed_width(values),
+                    "fitness": pa.array(fitness, pa.float64()),
+                }
+            )
+        )
+
+        self._run += 1
+        if len(self._runs) >= self.buffer_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if len(self._runs) == 0:
+            return
+
+        name = f"part-{self._part:05d}.parquet"
+        pq.write_table(
+            pa.concat_tables(self._runs), os.path.join(self.path, "runs", name)
+        )
+        pq.write_table(
+            pa.concat_tables(self._neighbors),
+            os.path.join(self.path, "neighbors", name),
+        )
+
+        self._part += 1
+        self._runs.clear()
+        self._neighbors.clear()
+
+    def close(self) -> None:
+        self.flush()
+
+    def __enter__(self) -> "NeighborhoodWriter":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+def config_key(config: dict) -> str:
+    """
+    Stable key of a configuration: the digest of its items sorted by name,
+    the same in every process and run
+    """
+    text = json.dumps(config, sort_keys=True, default=str)
+
+    return hashlib.sha1(text.encode()).hexdigest()[:16]
+
+
+class ResultStore:
+    """
+    CSV file to which the rows of every finished configuration are
+    appended together with its key, so that a sweep interrupted or split
+    in many runs skips the configurations already in the file.
+
+    Every append is a single write followed by a sync, the file never has
+    to be rewritten.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.columns = None
+        self._keys = set()
+
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            done = pd.read_csv(path, usecols=["config_key"], dtype=str)
+            self._keys = set(done["config_key"])
+            self.columns = list(pd.read_csv(path, nrows=0).columns)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._keys
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def append(
+        self, key: str, rows: pd.DataFrame | list[dict] | dict[str, list]
+    ) -> None:
+        """
+        Appends the rows of the configuration with the given key. Columns
+        of the file missing from the rows are left empty, columns not in
+        the file raise a ValueError, since the header is never rewritten.
+        """
+        df = pd.DataFrame(rows)
+        df.insert(0, "config_key", key)
+
+        header = self.columns is None
+        if header:
+            self.columns = list(df.columns)
+        unknown = [c for c in df.columns if c not in self.columns]
+        if len(unknown) > 0:
+            raise ValueError(f"columns {unknown} are not in {self.path}")
+        df = df.reindex(columns=self.columns)
+
+        buffer = io.StringIO()
+        df.to_csv(buffer, header=header, index=False)
+        with open(self.path, "a") as f:
+            f.write(buffer.getvalue())
+            f.flush()
+            os.fsync(f.fileno())
+
+        self._keys.add(key)
@@ -61,6 +61,34 @@ def get_args():
         help="specify the name of the output file without extension",
     )
 
+    parser.add_argument(
+        "--patience",
+        type=int,
+        default=None,
+        help="stop a run after this many generations without improvements",
+    )
+
+    parser.add_argument(
+        "--target-fraction",
+        type=float,
+        default=None,
+        help="stop a run when this fraction of the hall of fame hits the target",
+    )
+
+    parser.add_argument(
+        "--time-budget",
+        type=float,
+        default=None,
+        help="maximum seconds of a single run",
+    )
+
+    parser.add_argument(
+        "--eval-budget",
+        type=int,
+        default=None,
+        help="maximum number of evaluations of a single run",
+    )
+
     parser.add_argument(
         "--log",
         default="info",
@@ -1,5 +1,6 @@
 import os
 
+import numpy as np
 import pandas as pd
 from common import get_args, make_predictions
 from sklearn.ensemble import RandomForestClassifier
@@ -7,8 +8,46 @@ from sklearn.neural_network import MLPClassifier
 from sklearn.svm import SVC
 
 import neighborhood_generator as ng
+from neighborhood_generator import generator
 from ppga import log
 
+
+def summarize(runs: list[dict], model, targets: int) -> dict[str, list]:
+    """
+    Returns the statistics of the neighborhood of every (point, target)
+    run, with the same columns of `generate_deap`. The runs come in input
+    order, `targets` per point.
+    """
+    results = {
+        "point": [],
+        "class": [],
+        "target": [],
+        "model": [],
+        "min_fitness": [],
+        "mean_fitness": [],
+        "fitness_std": [],
+        "max_fitness": [],
+        "accuracy": [],
+        "stop_generation": [],
+    }
+    for i, run in enumerate(runs):
+        scores = np.asarray(run["neighborhood"]["fitness"])
+        outcomes = model.predict(run["neighborhood"]["chromosome"])
+
+        results["point"].append(i // targets)
+        results["class"].append(run["class"])
+        results["target"].append(run["target"])
+        results["model"].append(run["model"])
+        results["min_fitness"].append(scores.min())
+        results["mean_fitness"].append(scores.mean())
+        results["fitness_std"].append(scores.std())
+        results["max_fitness"].append(scores.max())
+        results["accuracy"].append(np.mean(outcomes == run["target"]))
+        results["stop_generation"].append(run["stats"]["stop_generation"])
+
+    return results
+
+
 if __name__ == "__main__":
     # CLI arguments
     args = get_args()
@@ -26,30 +65,26 @@ if __name__ == "__main__":
 
     logger.info(f"start explaining of {str(model).removesuffix('()')}")
 
+    # early stopping of the genetic runs
+    criteria = ng.termination.from_options(
+        patience=args.patience,
+        fraction=args.target_fraction,
+        seconds=args.time_budget,
+        evals=args.eval_budget,
+    )
+
     # get the datasets
     filepaths = [fp for fp in os.listdir("datasets") if fp.startswith("classification")]
     # filepaths = ["classification_10010_2_2_1_0.csv"]
     datasets = [pd.read_csv(f"datasets/{fp}") for fp in filepaths]
     logger.info(f"preparing to explain {len(datasets)} datasets")
 
-    # for every dataset run the blackbox and make explainations
-    results = {
-        "samples": [],
-        "features": [],
-        "classes": [],
-        "clusters": [],
-        "seed": [],
-        "population_size": [],  # single genetic run features
-        "point": [],
-        "class": [],
-        "target": [],
-        "model": [],
-        "min_fitness": [],  # genetic algorithm output
-        "mean_fitness": [],
-        "fitness_std": [],
-        "max_fitness": [],
-        "accuracy": [],
-    }
+    # every finished (population size, dataset) is appended to the store and
+    # skipped when the sweep is run again
+    store = ng.writer.ResultStore(
+        f"results/quality/ppga_{args.model}_{args.output}.csv"
+    )
+    logger.info(f"{len(store)} configurations already done")
 
     population_sizes = [1000, 2000, 4000, 8000, 16000]
     for ps in population_sizes:
@@ -58,12 +93,30 @@ if __name__ == "__main__":
             logger.info(f"model: {str(model).removesuffix('()')}")
             logger.info(f"population_size: {ps}")
 
+            key = ng.writer.config_key(
+                {
+                    "model": args.model,
+                    "dataset": fp,
+                    "population_size": ps,
+                    "patience": args.patience,
+                    "target_fraction": args.target_fraction,
+                    "time_budget": args.time_budget,
+                    "eval_budget": args.eval_budget,
+                }
+            )
+            if key in store:
+                logger.info("already done")
+                continue
+
             test_set, predictions = make_predictions(model, df, 10)
             logger.info(f"predictions to explain: {len(predictions)}")
 
             # generate neighbors stats
             # to repeat at least 5 times
-            stats = ng.generate(model, test_set, predictions, ps, args.workers)
+            runs = generator.generate(
+                test_set, predictions, model, ps, args.workers, criteria=criteria
+            )
+            stats = summarize(runs, model, len(np.unique(predictions)))
 
             for k in stats:
                 logger.info(f"{k}: {len(stats[k])}")
@@ -76,20 +129,15 @@ if __name__ == "__main__":
             clusters = int(dataset_specs[4])
             seed = int(dataset_specs[5])
 
-            results["samples"].extend([samples for _ in range(len(stats["point"]))])
-            results["features"].extend([features for _ in range(len(stats["point"]))])
-            results["classes"].extend([classes for _ in range(len(stats["point"]))])
-            results["clusters"].extend([clusters for _ in range(len(stats["point"]))])
-            results["seed"].extend([seed for _ in range(len(stats["point"]))])
-            results["population_size"].extend([ps for _ in range(len(stats["point"]))])
-
-            for k in stats:
-                results[k].extend(stats[k])
-
-            results_df = pd.DataFrame(results)
-            results_df.to_csv(
-                f"results/quality/ppga_{args.model}_{args.output}.csv",
-                header=True,
-                index=False,
-            )
-            print(results_df)
+            n = len(stats["point"])
+            results = {
+                "samples": [samples] * n,
+                "features": [features] * n,
+                "classes": [classes] * n,
+                "clusters": [clusters] * n,
+                "seed": [seed] * n,
+                "population_size": [ps] * n,
+                **stats,
+            }
+            store.append(key, results)
+            print(pd.DataFrame(results))
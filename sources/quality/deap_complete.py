@@ -26,30 +26,26 @@ if __name__ == "__main__":
 
     logger.info(f"start explaining of {str(model).removesuffix('()')}")
 
+    # early stopping of the genetic runs
+    criteria = ng.termination.from_options(
+        patience=args.patience,
+        fraction=args.target_fraction,
+        seconds=args.time_budget,
+        evals=args.eval_budget,
+    )
+
     # get the datasets
     filepaths = [fp for fp in os.listdir("datasets") if fp.startswith("classification")]
     # filepaths = ["classification_100_2_2_1_0.csv"]
     datasets = [pd.read_csv(f"datasets/{fp}") for fp in filepaths]
     logger.info(f"preparing to explain {len(datasets)} datasets")
 
-    # for every dataset run the blackbox and make explainations
-    results = {
-        "samples": [],
-        "features": [],
-        "classes": [],
-        "clusters": [],
-        "seed": [],
-        "population_size": [],  # single genetic run features
-        "point": [],
-        "class": [],
-        "target": [],
-        "model": [],
-        "min_fitness": [],  # genetic algorithm output
-        "mean_fitness": [],
-        "fitness_std": [],
-        "max_fitness": [],
-        "accuracy": [],
-    }
+    # every finished (population size, dataset) is appended to the store and
+    # skipped when the sweep is run again
+    store = ng.writer.ResultStore(
+        f"results/quality/deap_{args.model}_{args.output}.csv"
+    )
+    logger.info(f"{len(store)} configurations already done")
 
     population_sizes = [1000, 2000, 4000, 8000, 16000]
     for ps in population_sizes:
@@ -58,12 +54,29 @@ if __name__ == "__main__":
             logger.info(f"model: {str(model).removesuffix('()')}")
             logger.info(f"population_size: {ps}")
 
+            key = ng.writer.config_key(
+                {
+                    "model": args.model,
+                    "dataset": fp,
+                    "population_size": ps,
+                    "patience": args.patience,
+                    "target_fraction": args.target_fraction,
+                    "time_budget": args.time_budget,
+                    "eval_budget": args.eval_budget,
+                }
+            )
+            if key in store:
+                logger.info("already done")
+                continue
+
             test_set, predictions = make_predictions(model, df, 10)
             logger.info(f"predictions to explain: {len(predictions)}")
 
             # generate neighbors stats
             # to repeat at least 5 times
-            stats = ng.generate_deap(model, test_set, predictions, ps, args.workers)
+            stats = ng.generate_deap(
+                model, test_set, predictions, ps, args.workers, criteria
+            )
 
             for k in stats:
                 logger.info(f"{k}: {len(stats[k])}")
@@ -76,20 +89,15 @@ if __name__ == "__main__":
             clusters = int(dataset_specs[4])
             seed = int(dataset_specs[5])
 
-            results["samples"].extend([samples for _ in range(len(stats["point"]))])
-            results["features"].extend([features for _ in range(len(stats["point"]))])
-            results["classes"].extend([classes for _ in range(len(stats["point"]))])
-            results["clusters"].extend([clusters for _ in range(len(stats["point"]))])
-            results["seed"].extend([seed for _ in range(len(stats["point"]))])
-            results["population_size"].extend([ps for _ in range(len(stats["point"]))])
-
-            for k in stats:
-                results[k].extend(stats[k])
-
-            results_df = pd.DataFrame(results)
-            results_df.to_csv(
-                f"results/quality/deap_{args.model}_{args.output}.csv",
-                header=True,
-                index=False,
-            )
-            print(results_df)
+            n = len(stats["point"])
+            results = {
+                "samples": [samples] * n,
+                "features": [features] * n,
+                "classes": [classes] * n,
+                "clusters": [clusters] * n,
+                "seed": [seed] * n,
+                "population_size": [ps] * n,
+                **stats,
+            }
+            store.append(key, results)
+            print(pd.DataFrame(results))
@@ -0,0 +1,69 @@
+import gc
+import weakref
+
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.neural_network import MLPClassifier
+from sklearn.svm import SVC
+
+from neighborhood_generator import adapters
+
+
+@pytest.fixture
+def data():
+    rng = np.random.default_rng(0)
+    X = rng.random((300, 8))
+    y = np.digitize(X[:, 0] + X[:, 1], [0.7, 1.3])
+
+    return X, y, rng.random((2000, 8))
+
+
+MODELS = [
+    lambda: MLPClassifier(hidden_layer_sizes=(16,), max_iter=300, random_state=0),
+    lambda: SVC(),
+    lambda: SVC(kernel="poly"),
+    lambda: RandomForestClassifier(n_estimators=10, random_state=0),
+]
+
+
+@pytest.mark.filterwarnings("ignore::sklearn.exceptions.ConvergenceWarning")
+@pytest.mark.parametrize("make", MODELS)
+def test_same_predictions(data, make):
+    X, y, Z = data
+    model = make().fit(X, y)
+    adapter = adapters.adapt(model)
+
+    assert isinstance(adapter, adapters.Adapter)
+    np.testing.assert_array_equal(adapter.predict(Z), model.predict(Z))
+
+
+@pytest.mark.filterwarnings("ignore::sklearn.exceptions.ConvergenceWarning")
+@pytest.mark.parametrize("make", MODELS)
+def test_refit(data, make):
+    X, y, Z = data
+    model = make().fit(X, y)
+    adapters.adapt(model).predict(Z)
+
+    # the same object fitted again needs a new adapter
+    model.fit(X, (y + 1) % 3)
+    np.testing.assert_array_equal(adapters.adapt(model).predict(Z), model.predict(Z))
+
+
+def test_unsupported(data):
+    X, y, _ = data
+    model = LogisticRegression().fit(X, y)
+
+    assert adapters.adapt(model) is model
+
+
+def test_models_not_kept(data):
+    X, y, _ = data
+    model = RandomForestClassifier(n_estimators=2).fit(X, y)
+    adapters.adapt(model)
+
+    ref = weakref.ref(model)
+    del model
+    gc.collect()
+    assert ref() is None
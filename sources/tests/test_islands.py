@@ -0,0 +1,74 @@
+import threading
+
+import numpy as np
+import pytest
+from sklearn.linear_model import LogisticRegression
+
+from neighborhood_generator import genetic, islands, termination
+
+
+@pytest.fixture
+def toolbox():
+    rng = np.random.default_rng(0)
+    X = rng.random((200, 8))
+    y = (X[:, 0] > 0.5).astype(int)
+    model = LogisticRegression().fit(X, y)
+
+    return genetic.update_toolbox(genetic.create_toolbox(X), X[0], int(y[0]), model)
+
+
+def run(timeout: float, **kwargs):
+    """
+    Runs the islands in a thread, so that a deadlock fails the test instead
+    of hanging it
+    """
+    outcome = {}
+
+    def target():
+        outcome["result"] = islands.islands(**kwargs)
+
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive(), f"islands still running after {timeout} seconds"
+
+    return outcome["result"]
+
+
+@pytest.mark.parametrize("transport", islands.TRANSPORTS)
+def test_large_migrations(toolbox, transport):
+    # batches of migrants larger than the buffers of the connections
+    populations, stats = run(
+        120,
+        toolbox=toolbox,
+        population_size=1000,
+        islands_num=2,
+        max_generations=3,
+        migration_interval=1,
+        migrants=800,
+        topology="full",
+        transport=transport,
+    )
+
+    assert [len(p) for p in populations] == [1000, 1000]
+    assert [s.stop_generation for s in stats] == [3, 3]
+
+
+@pytest.mark.parametrize("transport", islands.TRANSPORTS)
+def test_early_termination(toolbox, transport):
+    # islands that stop before the others must not block their peers
+    populations, stats = run(
+        120,
+        toolbox=toolbox,
+        population_size=2000,
+        islands_num=3,
+        max_generations=6,
+        migration_interval=1,
+        migrants=2000,
+        topology="full",
+        transport=transport,
+        termination=[termination.Plateau(1)],
+    )
+
+    assert len(populations) == 3
+    assert all(s.stop_generation <= 6 for s in stats)